@@ -1,57 +1,133 @@
-import os
-import tkinter as tk
-from test1 import main as step1_main
-from test2 import step2_main
-from test3 import remove_teams_and_plus_lines
-from test4 import add_newline_after_uhr
-from test5 import remove_word_from_file
-from test6 import remove_lines_with_keywords
-from test7 import clean_schedule
-from test8 import merge_LEK_with_next_line
-from test9 import merge_teacher_names
-from test10 import add_timestamp_to_schedule
-from test11Wdays import extract_schedules
-from test12 import process_all_files_in_days_folder
-from test13 import merge_class_durations
-from test14 import remove_mittagspause_lines
-from test15 import calculate_day_hours_in_folder
-from test16_fix_praxis import remove_zero_duration_lines
-from test17 import create_schedule_document
-from testGUI_New import ThemeEditorApp
-
-def process_schedule_steps():
-    steps = [
-        ('schedule2.txt', 'schedule3.txt', remove_teams_and_plus_lines),
-        ('schedule3.txt', 'schedule4.txt', add_newline_after_uhr),
-        ('schedule4.txt', 'schedule5.txt', lambda i, o: remove_word_from_file(i, o, 'Uhr')),
-        ('schedule5.txt', 'schedule6.txt', lambda i, o: remove_lines_with_keywords(i, o, ["Theorieunterricht", "Konsultation"])),
-        ('schedule6.txt', 'schedule7.txt', clean_schedule),
-        ('schedule7.txt', 'schedule8.txt', merge_LEK_with_next_line),
-        ('schedule8.txt', 'schedule9.txt', merge_teacher_names),
-        ('schedule9.txt', 'schedule10.txt', add_timestamp_to_schedule),
-    ]
-
-    for input_file, output_file, func in steps:
-        func(input_file, output_file)
-        os.remove(input_file)
-
-
-def finalize_schedule():
-    extract_schedules('schedule10.txt')
-    os.remove('schedule10.txt')
-    process_all_files_in_days_folder()
-    merge_class_durations('days')
-    remove_mittagspause_lines('days')
-    calculate_day_hours_in_folder('days')
-    remove_zero_duration_lines('days')
-    create_schedule_document(input_file='schedule.txt', folder_path='days', output_file='Weekly_Class_Schedules.docx')
-
-if __name__ == "__main__":
-    step1_main()
-    step2_main()
-    process_schedule_steps()
-    finalize_schedule()
-
-    root = tk.Tk()
-    app = ThemeEditorApp(root)
-    root.mainloop()
+import os
+import atexit
+import argparse
+import multiprocessing
+import tkinter as tk
+from test1 import select_pdf_file, write_schedule_text
+from test2 import step2_main
+from test3 import remove_teams_and_plus_lines
+from test4 import add_newline_after_uhr
+from test5 import remove_word_from_file
+from test6 import remove_lines_with_keywords
+from test7 import clean_schedule
+from test8 import merge_LEK_with_next_line
+from test9 import merge_teacher_names
+from test10 import add_timestamp_to_schedule
+from pipeline import process_schedule_file, finalize_schedule
+from layout_extract import load_week_layout
+from test17 import create_schedule_document
+from pdf_cache import PdfTextCache
+from identity import resolve_user_name, NAME_ORDER_HELP
+from testGUI_New import ThemeEditorApp, TaskCancelled
+from profiling import profiler, file_size
+
+def process_schedule_steps(streaming=True, debug=False):
+    if streaming:
+        process_schedule_file('schedule2.txt', 'schedule10.txt', debug_dir='.' if debug else None)
+        os.remove('schedule2.txt')
+        return
+
+    steps = [
+        ('schedule2.txt', 'schedule3.txt', remove_teams_and_plus_lines),
+        ('schedule3.txt', 'schedule4.txt', add_newline_after_uhr),
+        ('schedule4.txt', 'schedule5.txt', lambda i, o: remove_word_from_file(i, o, 'Uhr')),
+        ('schedule5.txt', 'schedule6.txt', lambda i, o: remove_lines_with_keywords(i, o, ["Theorieunterricht", "Konsultation"])),
+        ('schedule6.txt', 'schedule7.txt', clean_schedule),
+        ('schedule7.txt', 'schedule8.txt', merge_LEK_with_next_line),
+        ('schedule8.txt', 'schedule9.txt', merge_teacher_names),
+        ('schedule9.txt', 'schedule10.txt', add_timestamp_to_schedule),
+    ]
+
+    for input_file, output_file, func in steps:
+        with profiler.stage(output_file, bytes_in=lambda: file_size(input_file)) as record:
+            func(input_file, output_file)
+            if profiler.enabled:
+                record['bytes_out'] = file_size(output_file)
+        os.remove(input_file)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the weekly class schedule and open the theme editor.")
+    parser.add_argument("--file-stages", action="store_true", help="run every stage through intermediate files")
+    parser.add_argument("--name", default=None,
+                        help=f"trainee name for the report header, remembered for later runs; {NAME_ORDER_HELP}")
+    parser.add_argument("--extract-workers", type=int, default=1, help="processes used to extract PDF pages")
+    parser.add_argument("--no-cache", action="store_true", help="always extract the PDF text again")
+    parser.add_argument("--newest-week-only", action="store_true",
+                        help="only extract the pages from the newest week on")
+    parser.add_argument("--layout", action="store_true",
+                        help="read the timetable cells from the text positions on the page in one pass")
+    parser.add_argument("--dump-stages", action="store_true", help="write schedule7.txt .. schedule10.txt for debugging")
+    parser.add_argument("--profile", nargs="?", const="classeditor_profile", default=None, metavar="PREFIX",
+                        help="record per-stage timings to PREFIX.jsonl and PREFIX.trace.json")
+    return parser.parse_args()
+
+def layout_stages(pdf_file, args):
+    # schedule.txt is still written, the theme editor reads the header
+    # fields from it when saving the PDF.
+    week = {}
+
+    def read_layout():
+        week["text"], week["days"] = load_week_layout(pdf_file, newest_week_only=args.newest_week_only)
+        with open('schedule.txt', 'w', encoding='utf-8') as file:
+            file.write(week["text"])
+
+    def finalize():
+        full_name = profiler.call('resolve user name', resolve_user_name, args.name)
+        create_schedule_document(input_file='schedule.txt', days=week["days"], full_name=full_name)
+
+    return [
+        ("reading the PDF layout", read_layout),
+        ("building the document", finalize),
+    ]
+
+def build_schedule(pdf_file, args, report, cancel_event):
+    # Runs on the GUI's worker thread; the stages report progress and the
+    # build can be cancelled between them.
+    cache = None if args.no_cache else PdfTextCache()
+
+    def step2():
+        with profiler.stage('test2 newest week', bytes_in=lambda: file_size('schedule.txt')) as record:
+            step2_main()
+            if profiler.enabled:
+                record['bytes_out'] = file_size('schedule2.txt')
+
+    def finalize():
+        full_name = profiler.call('resolve user name', resolve_user_name, args.name)
+        finalize_schedule(use_day_files=args.file_stages, full_name=full_name)
+
+    if args.layout:
+        stages = layout_stages(pdf_file, args)
+    else:
+        stages = [
+            ("reading PDF", lambda: write_schedule_text(pdf_file, max_workers=args.extract_workers, cache=cache,
+                                                            newest_week_only=args.newest_week_only)),
+            ("selecting the newest week", step2),
+            ("cleaning up the schedule", lambda: process_schedule_steps(streaming=not args.file_stages,
+                                                                         debug=args.dump_stages)),
+            ("building the document", finalize),
+        ]
+    for i, (description, stage) in enumerate(stages, 1):
+        if cancel_event.is_set():
+            raise TaskCancelled()
+        report(f"{description} ({i}/{len(stages)})")
+        stage()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.profile:
+        profiler.enable()
+        atexit.register(profiler.export, args.profile)
+
+    root = tk.Tk()
+    app = ThemeEditorApp(root, load=False)
+    pdf_file = select_pdf_file(root)
+    if not pdf_file:
+        print("No PDF file selected. Exiting...")
+        root.destroy()
+    else:
+        app.run_task(lambda report, cancel_event: build_schedule(pdf_file, args, report, cancel_event),
+                     lambda _: app.load_class_info(), "Building schedule")
+        root.mainloop()
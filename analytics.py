@@ -0,0 +1,181 @@
+import os
+import argparse
+import numpy as np
+from model import WEEKDAYS, ClassEntry
+from test17 import extract_kw_numbers, extract_dates_and_class
+from pipeline import load_week
+from pdf_report import report_from_docx
+from week_archive import WeekArchive, week_key
+
+# Hour accounting across many weeks. Records are kept as columns (class,
+# week, weekday, subject, instructor, minutes) with the strings replaced by
+# integer codes, so totals and breakdowns are bincounts instead of loops
+# over day files.
+
+
+def week_label(kw, first_date):
+    year = first_date.year if first_date else "?"
+    return f"{year}-KW{kw or '?'}"
+
+
+def records_from_pdf(pdf_file, max_hours=8):
+    schedule_text, days = load_week(pdf_file, max_hours=max_hours)
+    class_name, first_date, _ = extract_dates_and_class(schedule_text)
+    week = week_label("".join(extract_kw_numbers(schedule_text)), first_date)
+    for day_schedule in days:
+        for entry in day_schedule.entries:
+            yield class_name, week, day_schedule.day, entry.subject, entry.instructor, entry.minutes
+
+
+def records_from_docx(doc_path):
+    # Reads a generated report back, so weeks processed earlier count too.
+    header, day_rows = report_from_docx(doc_path)
+    parts = header["from"].split(".")
+    year = parts[2] if len(parts) == 3 else "?"
+    week = f"{year}-KW{header['kw'] or '?'}"
+    for day, rows in day_rows:
+        for text, duration in rows:
+            entry = ClassEntry.from_label(text)
+            try:
+                minutes = int(duration) * 60
+            except ValueError:
+                continue
+            yield header["class_name"], week, day, entry.subject, entry.instructor, minutes
+
+
+def records_from_archive(archive_file):
+    archive = WeekArchive(archive_file)
+    try:
+        for number in archive.scan():
+            header = archive.week_header(number)
+            week = f"{week_key(header)[0] or '?'}-KW{header['kw'] or '?'}"
+            for day, subject, instructor, minutes in archive.iter_entries(number):
+                yield header["class_name"], week, day, subject, instructor, minutes
+    finally:
+        archive.close()
+
+
+def collect_files(inputs):
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith((".pdf", ".docx", ".archive")))
+        else:
+            files.append(path)
+    return files
+
+
+def iter_records(paths, max_hours=8):
+    # A class's week that shows up more than once (its PDF, its report, an
+    # archive) is only counted the first time; the other weeks of the same
+    # file still count.
+    seen = set()
+    for path in collect_files(paths):
+        try:
+            if path.lower().endswith(".docx"):
+                records = list(records_from_docx(path))
+            elif path.lower().endswith(".archive"):
+                records = list(records_from_archive(path))
+            else:
+                records = list(records_from_pdf(path, max_hours))
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        weeks = {(record[0], record[1]) for record in records}
+        for class_name, week in sorted(weeks & seen):
+            print(f"Skipping {class_name} {week} in {path}: week already counted")
+        counted = weeks - seen
+        seen |= counted
+        for record in records:
+            if (record[0], record[1]) in counted:
+                yield record
+
+
+class HoursTable:
+    def __init__(self, labels, codes, minutes):
+        # labels: column name -> array of distinct strings
+        # codes: column name -> int32 array indexing into labels
+        self.labels = labels
+        self.codes = codes
+        self.minutes = minutes
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        columns = ("class", "week", "weekday", "subject", "instructor")
+        labels, codes = {}, {}
+        for index, name in enumerate(columns):
+            values = np.array([record[index] for record in records], dtype=object).astype(str)
+            if name == "weekday":
+                labels[name] = np.array(WEEKDAYS)
+                lookup = {day: i for i, day in enumerate(WEEKDAYS)}
+                codes[name] = np.array([lookup[value] for value in values], dtype=np.int32)
+            else:
+                labels[name], inverse = np.unique(values, return_inverse=True)
+                codes[name] = inverse.astype(np.int32).reshape(-1)
+        minutes = np.array([record[5] for record in records], dtype=np.int64)
+        return cls(labels, codes, minutes)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def total_minutes(self):
+        return int(self.minutes.sum())
+
+    def breakdown(self, column):
+        # (label, minutes) per value of column, largest first.
+        totals = np.bincount(self.codes[column], weights=self.minutes, minlength=len(self.labels[column]))
+        order = np.argsort(-totals, kind="stable")
+        return [(str(self.labels[column][i]), int(totals[i])) for i in order if totals[i]]
+
+    def day_totals(self):
+        # Total minutes per (class, week, weekday), as a dense array.
+        shape = (len(self.labels["class"]), len(self.labels["week"]), len(WEEKDAYS))
+        flat = np.ravel_multi_index((self.codes["class"], self.codes["week"], self.codes["weekday"]), shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape)))
+        totals = np.bincount(flat, weights=self.minutes, minlength=int(np.prod(shape)))
+        return totals.reshape(shape), counts.reshape(shape) > 0
+
+    def max_hours_report(self, max_hours=8):
+        # Days whose hours differ from max_hours: (class, week, weekday,
+        # minutes, difference in minutes), over first, then under.
+        totals, present = self.day_totals()
+        difference = totals - max_hours * 60
+        class_index, week_index, day_index = np.nonzero(present & (difference != 0))
+        order = np.lexsort((day_index, week_index, class_index, -difference[class_index, week_index, day_index]))
+        return [
+            (str(self.labels["class"][c]), str(self.labels["week"][w]), WEEKDAYS[d],
+             int(totals[c, w, d]), int(difference[c, w, d]))
+            for c, w, d in zip(class_index[order], week_index[order], day_index[order])
+        ]
+
+
+def print_breakdown(title, rows):
+    print(title)
+    for label, minutes in rows:
+        print(f"  {label:<40} {minutes / 60:>8.1f} h")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hour totals and checks across many processed weeks.")
+    parser.add_argument("inputs", nargs="+", help="timetable PDFs, generated DOCX reports, week archives or folders of them")
+    parser.add_argument("--max-hours", type=int, default=8)
+    parser.add_argument("--by", nargs="+", default=["subject", "instructor", "week"],
+                        choices=["class", "week", "weekday", "subject", "instructor"])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    table = HoursTable.from_records(iter_records(args.inputs, args.max_hours))
+    if not len(table):
+        print("No records found.")
+    else:
+        print(f"{len(table)} entries, {table.total_minutes() / 60:.1f} h in total")
+        for column in args.by:
+            print_breakdown(f"Hours by {column}:", table.breakdown(column))
+        report = table.max_hours_report(args.max_hours)
+        print(f"Days not at {args.max_hours} h: {len(report)}")
+        for class_name, week, day, minutes, difference in report:
+            print(f"  {class_name:<12} {week:<10} {day:<10} {minutes / 60:>5.1f} h ({difference / 60:+.1f})")
@@ -0,0 +1,132 @@
+import os
+import argparse
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from test1 import extract_text_from_pdf, extract_newest_week_text
+from test2 import step2_main
+from test17 import extract_kw_numbers
+from pipeline import process_schedule_file, finalize_schedule
+from pdf_cache import PdfTextCache, DEFAULT_CACHE_DIR
+from pdf_report import report_from_docx, render_report_pdf
+from identity import resolve_user_name, NAME_ORDER_HELP
+
+REPORT_PREFIX = "Weekly_Class_Schedules"
+
+
+def collect_pdf_files(inputs):
+    pdf_files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for filename in sorted(os.listdir(path)):
+                if filename.lower().endswith('.pdf'):
+                    pdf_files.append(os.path.join(path, filename))
+        elif path.lower().endswith('.pdf'):
+            pdf_files.append(path)
+        else:
+            print(f"Skipping {path}: not a PDF file or folder.")
+    return pdf_files
+
+
+def claim_output_path(output_dir, kw_label, pdf_file):
+    # Several PDFs can belong to the same week, so the first one gets the
+    # plain name and the others fall back to a name that includes the PDF.
+    candidates = [
+        os.path.join(output_dir, f"{REPORT_PREFIX}_{kw_label}.docx"),
+        os.path.join(output_dir, f"{REPORT_PREFIX}_{kw_label}_{os.path.splitext(os.path.basename(pdf_file))[0]}.docx"),
+    ]
+    for candidate in candidates:
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return candidate
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Output for {pdf_file} already exists: {candidates[-1]}")
+
+
+def build_report(pdf_file, output_dir, include_signature=True, extract_workers=1, cache_dir=None, export_pdf=False,
+                 full_name=None, newest_week_only=False):
+    # Every stage works on fixed names in the current directory, so each job
+    # runs inside its own temporary workspace. This relies on the job owning
+    # its process, which is why reports are built on a process pool.
+    pdf_file = os.path.abspath(pdf_file)
+    output_dir = os.path.abspath(output_dir)
+    cache = PdfTextCache(cache_dir) if cache_dir else None
+    previous_dir = os.getcwd()
+    workspace = tempfile.mkdtemp(prefix="classeditor_")
+    os.chdir(workspace)
+    try:
+        if newest_week_only:
+            text_content = extract_newest_week_text(pdf_file, max_workers=extract_workers, cache=cache)
+        else:
+            text_content = extract_text_from_pdf(pdf_file, max_workers=extract_workers, cache=cache)
+        with open("schedule.txt", "w", encoding="utf-8") as txt_file:
+            txt_file.write(text_content)
+
+        step2_main()
+        process_schedule_file('schedule2.txt', 'schedule10.txt')
+        os.remove('schedule2.txt')
+        finalize_schedule(output_file='report.docx', include_signature=include_signature, full_name=full_name)
+
+        kw_numbers = extract_kw_numbers(text_content)
+        kw_label = "_".join(kw_numbers) if kw_numbers else "KW_Unknown"
+        output_file = claim_output_path(output_dir, kw_label, pdf_file)
+        shutil.move('report.docx', output_file)
+        if export_pdf:
+            header, day_rows = report_from_docx(output_file)
+            render_report_pdf(os.path.splitext(output_file)[0] + '.pdf', header, day_rows, include_signature)
+        return output_file
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def run_batch(inputs, output_dir='.', max_workers=None, include_signature=True, extract_workers=1,
+              cache_dir=DEFAULT_CACHE_DIR, export_pdf=False, full_name=None, newest_week_only=False):
+    pdf_files = collect_pdf_files(inputs)
+    # Resolved once here instead of in every worker.
+    full_name = resolve_user_name(full_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(build_report, pdf_file, output_dir, include_signature, extract_workers, cache_dir,
+                            export_pdf, full_name, newest_week_only): pdf_file
+            for pdf_file in pdf_files
+        }
+        for future in as_completed(futures):
+            pdf_file = futures[future]
+            try:
+                results[pdf_file] = future.result()
+                print(f"{pdf_file} -> {results[pdf_file]}")
+            except Exception as e:
+                results[pdf_file] = None
+                print(f"Failed to process {pdf_file}: {e}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build weekly class schedule reports for many timetable PDFs.")
+    parser.add_argument("inputs", nargs="+", help="PDF files or folders containing PDF files")
+    parser.add_argument("-o", "--output-dir", default=".", help="folder for the generated DOCX files")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--extract-workers", type=int, default=1, help="processes per report used to extract PDF pages")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="folder for cached PDF text")
+    parser.add_argument("--no-cache", action="store_true", help="always extract the PDF text again")
+    parser.add_argument("--name", default=None, help="trainee name for the report headers; " + NAME_ORDER_HELP)
+    parser.add_argument("--newest-week-only", action="store_true", help="only extract the pages from the newest week on")
+    parser.add_argument("--pdf", action="store_true", help="also write a PDF next to every DOCX")
+    parser.add_argument("--no-signature", action="store_true", help="leave out the signature section")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_batch(args.inputs, args.output_dir, args.workers, include_signature=not args.no_signature,
+                        extract_workers=args.extract_workers, cache_dir=None if args.no_cache else args.cache_dir,
+                        export_pdf=args.pdf, full_name=args.name, newest_week_only=args.newest_week_only)
+    failed = [pdf_file for pdf_file, output_file in results.items() if output_file is None]
+    print(f"Built {len(results) - len(failed)} of {len(results)} reports.")
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from test17 import add_day_schedule, add_week_schedule_fast, set_text_to_calibri, set_paragraphs_font
+
+DAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
+
+
+def make_days(row_count):
+    per_day = max(row_count // len(DAYS), 1)
+    return [
+        (day, [(f"Fach {day} {i}", f"Lehrer {i % 7}", str(i % 4 + 1)) for i in range(per_day)])
+        for day in DAYS
+    ]
+
+
+def new_schedule_table():
+    doc = Document()
+    table = doc.add_table(rows=1, cols=8)
+    table.style = 'Table Grid'
+    return doc, table
+
+
+def build_legacy(days_class_info):
+    doc, table = new_schedule_table()
+    for day, class_info in days_class_info:
+        add_day_schedule(day, class_info, table)
+    set_text_to_calibri(doc)
+    return doc
+
+
+def build_fast(days_class_info):
+    doc, table = new_schedule_table()
+    add_week_schedule_fast(days_class_info, table)
+    set_paragraphs_font(doc.paragraphs)
+    return doc
+
+
+def time_call(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare schedule table generation paths.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[25, 50, 100, 200, 400])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=int, default=400,
+                        help="row count above which the legacy path is not timed")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy s':>10} {'fast s':>10} {'speedup':>8}")
+    for row_count in args.rows:
+        days = make_days(row_count)
+        fast = time_call(build_fast, days, repeat=args.repeat)
+        if row_count <= args.skip_legacy_above:
+            legacy = time_call(build_legacy, days, repeat=args.repeat)
+            print(f"{row_count:>8} {legacy:>10.3f} {fast:>10.3f} {legacy / fast:>7.1f}x")
+        else:
+            print(f"{row_count:>8} {'-':>10} {fast:>10.3f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
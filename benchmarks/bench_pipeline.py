@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from synthetic import iter_week_texts, write_pdf
+from test1 import extract_text_from_pdf
+from test2 import remove_lines_before_newest_date, move_timestamps_to_new_line
+from test11Wdays import split_schedule_days
+from test17 import build_schedule_document
+from pipeline import SCHEDULE_RULES, split_lines, cleanup_stages, day_stages
+from model import WEEKDAYS, DaySchedule
+from multi_week import create_multi_week_document
+from pdf_report import report_from_docx, render_report_pdf
+from testGUI_New import extract_class_info_from_docx
+from docx_reader import apply_themes_to_document
+
+# Times every stage from test2 to the DOCX and the theme editor helpers on
+# synthetic weeks, and compares the result with a stored baseline. The
+# cleanup and day stages are the ones pipeline.py runs, timed one by one.
+#
+# Timings depend on the machine, so no baseline is checked in. Record one
+# on the machine that runs the comparison, before the change under test:
+#
+#   python benchmarks/bench_pipeline.py --size year --save-baseline
+#   python benchmarks/bench_pipeline.py --size year --compare
+#
+# Baselines are stored per size, class count and --pdf in baseline.json
+# next to this file.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = {"week": 1, "year": 52, "long": 1000}
+FULL_NAME = "Benchmark"
+
+
+class StageTimer:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def run(self, name, func, *args):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        stats = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_bytes": 0})
+        stats["seconds"] += elapsed
+        stats["calls"] += 1
+        if self.trace_memory:
+            stats["peak_bytes"] = max(stats["peak_bytes"], tracemalloc.get_traced_memory()[1] - before)
+        return result
+
+
+def run_cleanup_stages(timer, lines):
+    for _, stage_name, stage in cleanup_stages(SCHEDULE_RULES):
+        lines = timer.run(stage_name, lambda: list(stage(lines)))
+    return lines
+
+
+def run_day_stages(timer, lines, max_hours=8):
+    days = timer.run("test11 split days", split_schedule_days, lines)
+    stages = day_stages(max_hours)
+    schedules = []
+    for day in WEEKDAYS:
+        if day not in days:
+            continue
+        entries = days[day]
+        for stage_name, stage in stages:
+            entries = timer.run(stage_name, stage, entries)
+        schedules.append(DaySchedule(day, entries))
+    return schedules
+
+
+def run_week(timer, schedule_text, work_dir, themes):
+    content = timer.run("test2 newest week", lambda: move_timestamps_to_new_line(
+        remove_lines_before_newest_date(schedule_text)))
+    lines = run_cleanup_stages(timer, split_lines(content))
+    days = run_day_stages(timer, lines)
+
+    doc_path = os.path.join(work_dir, "week.docx")
+    doc = timer.run("test17 build document", build_schedule_document, schedule_text, 'days', None, True, days,
+                    True, FULL_NAME)
+    timer.run("test17 save document", doc.save, doc_path)
+
+    timer.run("gui extract class info", extract_class_info_from_docx, doc_path)
+    doc = timer.run("gui load document", Document, doc_path)
+    timer.run("gui apply themes", apply_themes_to_document, doc, themes)
+    timer.run("gui save document", doc.save, doc_path)
+    header, day_rows = timer.run("pdf read report", report_from_docx, doc_path)
+    timer.run("pdf render", render_report_pdf, os.path.join(work_dir, "week.pdf"), header, day_rows)
+    return days
+
+
+def run_benchmark(weeks, classes_per_day, from_pdf=False, trace_memory=False, seed=0):
+    timer = StageTimer(trace_memory)
+    themes = {"Mathematik / Mueller": "Analysis / Mueller", "Sonderveranstaltung": "Projekttag"}
+    with tempfile.TemporaryDirectory() as work_dir:
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            built_weeks = []
+            for week, schedule_text in enumerate(iter_week_texts(weeks, classes_per_day, seed)):
+                if from_pdf:
+                    pdf_file = write_pdf(schedule_text, os.path.join(work_dir, f"week_{week}.pdf"))
+                    schedule_text = timer.run("test1 extract pdf", extract_text_from_pdf, pdf_file)
+                days = run_week(timer, schedule_text, work_dir, themes)
+                if weeks > 1:
+                    built_weeks.append((schedule_text, days))
+            if built_weeks:
+                timer.run("multi week document", create_multi_week_document, built_weeks,
+                          os.path.join(work_dir, "multi.docx"), True, FULL_NAME)
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+    return timer.stages
+
+
+def benchmark_key(weeks, classes_per_day, from_pdf):
+    return f"{weeks}w-{classes_per_day}c" + ("-pdf" if from_pdf else "")
+
+
+def load_baselines(baseline_file):
+    if not os.path.exists(baseline_file):
+        return {}
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(baseline_file, key, stages):
+    baselines = load_baselines(baseline_file)
+    baselines[key] = stages
+    with open(baseline_file, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def compare(stages, baseline, tolerance, min_seconds=0.005, min_bytes=64 * 1024):
+    regressions = []
+    for name, stats in stages.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if stats["seconds"] > base["seconds"] * (1 + tolerance) and stats["seconds"] - base["seconds"] > min_seconds:
+            regressions.append(f"{name}: {base['seconds']:.3f}s -> {stats['seconds']:.3f}s")
+        if (base["peak_bytes"] and stats["peak_bytes"] > base["peak_bytes"] * (1 + tolerance)
+                and stats["peak_bytes"] - base["peak_bytes"] > min_bytes):
+            regressions.append(f"{name}: peak {base['peak_bytes']} -> {stats['peak_bytes']} bytes")
+    return regressions
+
+
+def print_stages(stages):
+    print(f"{'stage':<26} {'calls':>6} {'total s':>9} {'per call ms':>12} {'peak KiB':>10}")
+    for name, stats in stages.items():
+        per_call = stats["seconds"] / stats["calls"] * 1000
+        print(f"{name:<26} {stats['calls']:>6} {stats['seconds']:>9.3f} {per_call:>12.2f} "
+              f"{stats['peak_bytes'] / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic timetables.")
+    parser.add_argument("--size", choices=SIZES, default="week", help="number of weeks: week=1, year=52, long=1000")
+    parser.add_argument("--weeks", type=int, default=None, help="overrides --size")
+    parser.add_argument("--classes", type=int, default=6, help="classes per day")
+    parser.add_argument("--pdf", action="store_true", help="start from generated PDFs instead of text")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if a stage regressed against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --compare fails")
+    args = parser.parse_args()
+
+    weeks = args.weeks or SIZES[args.size]
+    # Time and memory are measured in separate passes because tracemalloc
+    # slows the traced code down considerably.
+    stages = run_benchmark(weeks, args.classes, args.pdf, seed=args.seed)
+    if not args.no_memory:
+        memory = run_benchmark(weeks, args.classes, args.pdf, trace_memory=True, seed=args.seed)
+        for name, stats in stages.items():
+            stats["peak_bytes"] = memory[name]["peak_bytes"]
+    print_stages(stages)
+
+    key = benchmark_key(weeks, args.classes, args.pdf)
+    if args.save_baseline:
+        save_baseline(args.baseline_file, key, stages)
+        print(f"Saved baseline {key} to {args.baseline_file}")
+    if args.compare:
+        baseline = load_baselines(args.baseline_file).get(key)
+        if baseline is None:
+            print(f"No baseline {key} in {args.baseline_file}; record one first with --save-baseline")
+            sys.exit(2)
+        regressions = compare(stages, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from synthetic import week_text, write_pdf, write_grid_pdf
+from pipeline import load_week
+from layout_extract import load_week_layout
+
+# Writes every synthetic week twice, as the flat PDF the text pipeline
+# reads and as a timetable grid with weekday columns, and checks that the
+# layout extraction of the grid gives the same days as the text pipeline.
+
+
+def day_entries(days):
+    return [(day_schedule.day, day_schedule.entries) for day_schedule in days]
+
+
+def check_week(week, classes_per_day, work_dir, seed=0):
+    flat_pdf = write_pdf(week_text(week, classes_per_day, seed=seed), os.path.join(work_dir, "flat.pdf"))
+    grid_pdf = write_grid_pdf(week, os.path.join(work_dir, "grid.pdf"), classes_per_day, seed=seed)
+    expected = day_entries(load_week(flat_pdf)[1])
+    found = day_entries(load_week_layout(grid_pdf)[1])
+    return expected == found, expected, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the layout extraction with the text pipeline.")
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--classes", type=int, nargs="+", default=[3, 6, 9], help="classes per day")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        for classes_per_day in args.classes:
+            for week in range(args.weeks):
+                same, expected, found = check_week(week, classes_per_day, work_dir, args.seed)
+                if not same:
+                    failures += 1
+                    print(f"MISMATCH week {week}, {classes_per_day} classes per day")
+                    print(f"  text:   {expected}")
+                    print(f"  layout: {found}")
+    checked = args.weeks * len(args.classes)
+    print(f"{checked - failures} of {checked} weeks match")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from synthetic import week_text
+from test2 import remove_lines_before_newest_date, move_timestamps_to_new_line
+from test3 import remove_teams_and_plus_lines
+from test4 import add_newline_after_uhr
+from test5 import remove_word_from_file
+from test6 import remove_lines_with_keywords
+from test7 import clean_schedule
+from pipeline import SCHEDULE_RULES, split_lines
+
+# Checks the schedule rules against fixed cases and against the old
+# file-based test3 to test7 on synthetic weeks. The cases pin where the two
+# differ on purpose: the rules see one line at a time, test7 saw the whole
+# file and its \s* could join a line to the next one.
+
+CASES = [
+    (["Teams Besprechung", "Mathe (+1)", "Deutsch"], ["Deutsch"]),
+    (["08:00-09:30 UhrMathe"], ["08:00-09:30 ", "Mathe"]),
+    (["Praxisunterricht 45 min"], ["Praxisunterricht"]),
+    (["Mittagspause30 min", "Theorieunterricht"], ["Mittagspause"]),
+    # test7 turned these into "Mittagspause 10:00" and "Praxisunterrichts Test".
+    (["Mittagspause", "min 10:00"], ["Mittagspause", "min 10:00"]),
+    (["Praxisunterricht", "mins Test"], ["Praxisunterricht", "mins Test"]),
+]
+
+
+def file_chain(text, work_dir):
+    files = [os.path.join(work_dir, f"schedule{i}.txt") for i in range(2, 8)]
+    with open(files[0], "w", encoding="utf-8") as f:
+        f.write(text)
+    remove_teams_and_plus_lines(files[0], files[1])
+    add_newline_after_uhr(files[1], files[2])
+    remove_word_from_file(files[2], files[3], "Uhr")
+    remove_lines_with_keywords(files[3], files[4], ["Theorieunterricht", "Konsultation"])
+    clean_schedule(files[4], files[5])
+    with open(files[5], "r", encoding="utf-8") as f:
+        return split_lines(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the schedule rules against fixed cases and test3 to test7.")
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--classes", type=int, nargs="+", default=[3, 6, 9], help="classes per day")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    for lines, expected in CASES:
+        found = list(SCHEDULE_RULES.apply(lines))
+        if found != expected:
+            failures += 1
+            print(f"MISMATCH {lines}: expected {expected}, got {found}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for classes_per_day in args.classes:
+            for week in range(args.weeks):
+                text = week_text(week, classes_per_day, seed=args.seed)
+                text = move_timestamps_to_new_line(remove_lines_before_newest_date(text))
+                expected = file_chain(text, work_dir)
+                found = list(SCHEDULE_RULES.apply(split_lines(text)))
+                if found != expected:
+                    failures += 1
+                    print(f"MISMATCH week {week}, {classes_per_day} classes per day")
+    checked = len(CASES) + args.weeks * len(args.classes)
+    print(f"{checked - failures} of {checked} checks pass")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import re
+import sys
+import random
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_report import PdfCanvas, MARGIN, FONT_SIZE, PAGE_WIDTH, text_width, wrap_text
+from model import WEEKDAYS
+
+# Deterministic timetable text in the shape PyPDF2 returns for the school
+# timetable: a header with class, KW and the week's dates, then per day the
+# class labels, their time ranges and the noise lines the cleanup stages
+# remove (Teams links, "(+n)" markers, Konsultation, Mittagspause). Days
+# are not labelled; the pipeline tells them apart by the 16:00 end time.
+# write_grid_pdf lays the same week out as a timetable grid with one column
+# per weekday, for the layout extraction.
+
+SUBJECTS = ["Mathematik", "Deutsch", "Englisch", "Wirtschaft", "Netzwerke", "Datenbanken",
+            "Anwendungsentwicklung", "IT-Systeme", "Politik", "Sport", "Religion", "Projektmanagement"]
+TEACHERS = ["Mueller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+            "Schulz", "Hoffmann", "Koch", "Richter"]
+FIRST_WEEK = date(2024, 1, 1)
+DAY_START = 8 * 60
+DAY_END = 16 * 60
+GRID_FONT_SIZE = 7
+TIME_AXIS_WIDTH = 30
+TIME_RANGE_PATTERN = re.compile(r'\d{2}:\d{2}-\d{2}:\d{2}')
+
+
+def hm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def day_lines(rng, classes_per_day):
+    # Splits 08:00-16:00 into classes_per_day blocks; the last block always
+    # ends at 16:00 (or 16:15), which is how the day splitter finds the end.
+    lines = []
+    cuts = sorted(rng.sample(range(DAY_START + 15, DAY_END - 15, 15), classes_per_day - 1)) if classes_per_day > 1 else []
+    bounds = [DAY_START] + cuts + [DAY_END]
+    lunch = rng.randrange(len(bounds) - 1)
+    for i in range(len(bounds) - 1):
+        start, end = bounds[i], bounds[i + 1]
+        if i == len(bounds) - 2 and rng.random() < 0.3:
+            end += 15
+        if rng.random() < 0.2:
+            lines.append(f"Teams Besprechung {rng.randrange(1000)}")
+        if rng.random() < 0.1:
+            lines.append(f"(+{rng.randrange(1, 4)} weitere)")
+        time_range = f"{hm(start)}-{hm(end)} Uhr"
+        kind = rng.random()
+        if kind < 0.15:
+            lines.append(f"Praxisunterricht {end - start} min {time_range}")
+        elif kind < 0.2:
+            lines.append(f"LEK {rng.choice(SUBJECTS)}")
+            lines.append(f"{rng.choice(SUBJECTS)} / {rng.choice(TEACHERS)} {time_range}")
+        elif kind < 0.25:
+            lines.append(f"Sonderveranstaltung {time_range}")
+        else:
+            lines.append(f"{rng.choice(SUBJECTS)} / {rng.choice(TEACHERS)} {time_range}")
+        if i == lunch and i < len(bounds) - 2:
+            lines.append(f"Mittagspause45 min {hm(end)}-{hm(end)}")
+        if rng.random() < 0.05:
+            lines.append("Konsultation nach Vereinbarung")
+    return lines
+
+
+def week_days(week, classes_per_day=6, class_name="FIAE 23", seed=0):
+    # Header lines, the date of every weekday and the lines of every day.
+    rng = random.Random(seed * 1000003 + week)
+    monday = FIRST_WEEK + timedelta(weeks=week)
+    dates = [monday + timedelta(days=i) for i in range(len(WEEKDAYS))]
+    header = [
+        "Stundenplan",
+        f"Klasse: {class_name}",
+        f"KW: {monday.isocalendar()[1]}",
+        f"{monday:%d.%m.%Y} - {dates[-1]:%d.%m.%Y}",
+    ]
+    return header, dates, [day_lines(rng, classes_per_day) for _ in WEEKDAYS]
+
+
+def week_text(week, classes_per_day=6, class_name="FIAE 23", seed=0):
+    header, _, days = week_days(week, classes_per_day, class_name, seed)
+    return "\n".join(header + [line for lines in days for line in lines]) + "\n"
+
+
+def iter_week_texts(weeks, classes_per_day=6, seed=0):
+    for week in range(weeks):
+        yield week_text(week, classes_per_day, seed=seed)
+
+
+def write_pdf(text, output_file):
+    # One line of text per line of the PDF, so PyPDF2 reads the lines back.
+    canvas = PdfCanvas()
+    leading = FONT_SIZE * 1.2
+    for line in text.splitlines():
+        canvas.ensure_space(leading)
+        canvas.y -= leading
+        canvas.text(MARGIN, canvas.y, line, FONT_SIZE)
+    canvas.save(output_file)
+    return output_file
+
+
+def write_grid_pdf(week, output_file, classes_per_day=6, class_name="FIAE 23", seed=0):
+    # The week of week_text as a timetable grid: weekday names centred over
+    # their columns, hour marks on the left, labels wrapped to the column
+    # width and time ranges on a line of their own.
+    header, dates, days = week_days(week, classes_per_day, class_name, seed)
+    canvas = PdfCanvas()
+    leading = FONT_SIZE * 1.2
+    for line in header:
+        canvas.y -= leading
+        canvas.text(MARGIN, canvas.y, line, FONT_SIZE)
+
+    left = MARGIN / 2 + TIME_AXIS_WIDTH
+    column_width = (PAGE_WIDTH - MARGIN / 2 - left) / len(WEEKDAYS)
+    small_leading = GRID_FONT_SIZE * 1.2
+    header_y = canvas.y - leading * 2
+    for i, (day, day_date) in enumerate(zip(WEEKDAYS, dates)):
+        title = f"{day} {day_date:%d.%m.}"
+        canvas.text(left + i * column_width + (column_width - text_width(title, GRID_FONT_SIZE)) / 2, header_y,
+                    title, GRID_FONT_SIZE)
+    for hour in range(DAY_START // 60, DAY_END // 60 + 1):
+        canvas.text(MARGIN / 2, header_y - (hour - DAY_START // 60 + 1) * small_leading * 4, f"{hour:02d}:00",
+                    GRID_FONT_SIZE)
+
+    for i, lines in enumerate(days):
+        x = left + i * column_width + 2
+        y = header_y - small_leading
+        for line in lines:
+            match = TIME_RANGE_PATTERN.search(line)
+            if match:
+                parts = wrap_text(line[:match.start()].strip(), column_width - 4, GRID_FONT_SIZE)
+                parts.append(line[match.start():])
+            else:
+                parts = [line]
+            for part in parts:
+                y -= small_leading
+                canvas.text(x, y, part, GRID_FONT_SIZE)
+            if match:
+                y -= small_leading / 2
+    canvas.save(output_file)
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic timetables as text or PDF files.")
+    parser.add_argument("-o", "--output-dir", default="synthetic")
+    parser.add_argument("--weeks", type=int, default=1)
+    parser.add_argument("--classes", type=int, default=6, help="classes per day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf", action="store_true", help="write PDFs instead of text files")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for week, text in enumerate(iter_week_texts(args.weeks, args.classes, args.seed)):
+        base = os.path.join(args.output_dir, f"week_{week:04d}")
+        if args.pdf:
+            write_pdf(text, base + ".pdf")
+        else:
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(text)
+    print(f"Wrote {args.weeks} weeks to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import zipfile
+from lxml import etree
+from model import WEEKDAYS
+
+# Reads table rows straight from word/document.xml. Merged cells are
+# expanded by their gridSpan (and vertically merged cells repeat the cell
+# above), which gives the same cell lists as python-docx's row.cells
+# without building its cell grid for every row.
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+BODY = f"{{{W_NS}}}body"
+TBL = f"{{{W_NS}}}tbl"
+TR = f"{{{W_NS}}}tr"
+TC = f"{{{W_NS}}}tc"
+TC_PR = f"{{{W_NS}}}tcPr"
+P = f"{{{W_NS}}}p"
+T = f"{{{W_NS}}}t"
+TAB = f"{{{W_NS}}}tab"
+BR = f"{{{W_NS}}}br"
+CR = f"{{{W_NS}}}cr"
+GRID_SPAN = f"{{{W_NS}}}gridSpan"
+V_MERGE = f"{{{W_NS}}}vMerge"
+VAL = f"{{{W_NS}}}val"
+
+
+def cell_text(tc):
+    paragraphs = []
+    for p in tc.iterchildren(P):
+        parts = []
+        for element in p.iter(T, TAB, BR, CR):
+            if element.tag == T:
+                parts.append(element.text or "")
+            elif element.tag == TAB:
+                parts.append("\t")
+            else:
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def row_cells(tr, previous=None):
+    # Returns the expanded cell texts and the w:tc element behind each one.
+    texts, elements = [], []
+    for tc in tr.iterchildren(TC):
+        span = 1
+        v_merge = None
+        tc_pr = tc.find(TC_PR)
+        if tc_pr is not None:
+            grid_span = tc_pr.find(GRID_SPAN)
+            if grid_span is not None:
+                span = int(grid_span.get(VAL, 1))
+            merge = tc_pr.find(V_MERGE)
+            if merge is not None:
+                v_merge = merge.get(VAL, "continue")
+
+        column = len(texts)
+        if v_merge == "continue" and previous and column < len(previous[0]):
+            text, element = previous[0][column], previous[1][column]
+        else:
+            text, element = cell_text(tc), tc
+        texts.extend([text] * span)
+        elements.extend([element] * span)
+    return texts, elements
+
+
+def iter_docx_rows(doc_path):
+    # Yields (table number, cell texts) for every row of the top-level
+    # tables while parsing, and drops what has been read to keep memory flat.
+    with zipfile.ZipFile(doc_path) as docx_zip, docx_zip.open("word/document.xml") as document_xml:
+        table_number = -1
+        current_table = None
+        previous = None
+        for _, element in etree.iterparse(document_xml, events=("end",), tag=(TR, TBL, P)):
+            parent = element.getparent()
+            if element.tag == TR:
+                if parent.getparent() is None or parent.getparent().tag != BODY:
+                    continue
+                if parent is not current_table:
+                    current_table = parent
+                    table_number += 1
+                    previous = None
+                previous = row_cells(element, previous)
+                yield table_number, previous[0]
+                previous = (previous[0], [None] * len(previous[0]))
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+            elif parent is not None and parent.tag == BODY:
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+
+def iter_document_rows(doc):
+    # Same rows as iter_docx_rows for a python-docx Document in memory.
+    for table_number, tbl in enumerate(doc.element.body.iterchildren(TBL)):
+        previous = None
+        for tr in tbl.iterchildren(TR):
+            previous = row_cells(tr, previous)
+            yield table_number, previous[0]
+
+
+def iter_class_info(rows):
+    current_day = None
+    for _, cells in rows:
+        if len(cells) >= 7:
+            day_text = cells[0].strip()
+            if day_text in WEEKDAYS:
+                current_day = day_text
+                continue
+            if current_day:
+                theme = cells[1].strip()
+                instructor = cells[4].strip()
+                if theme and instructor:
+                    yield current_day, theme, instructor
+
+
+def iter_class_info_from_docx(doc_path):
+    return iter_class_info(iter_docx_rows(doc_path))
+
+
+def index_theme_cells(doc):
+    from docx.table import _Cell
+
+    cell_index = {}
+    for tbl in doc.element.body.iterchildren(TBL):
+        previous = None
+        for tr in tbl.iterchildren(TR):
+            previous = row_cells(tr, previous)
+            texts, elements = previous
+            if len(texts) >= 7:
+                cell_index.setdefault(texts[1].strip(), []).append(_Cell(elements[1], None))
+    return cell_index
+
+
+def apply_themes_to_document(doc, updated_themes):
+    apply_themes_to_cells(index_theme_cells(doc), updated_themes)
+
+
+def apply_themes_to_cells(cell_index, updated_themes):
+    # Same single-pass result as apply_themes_to_document, but only the
+    # cells whose text has a mapping are touched. cell_index maps the
+    # stripped cell text to its cells and is kept up to date.
+    moves = [(theme, updated_themes[theme]) for theme in cell_index.keys() & updated_themes.keys()
+             if updated_themes[theme] != theme]
+    buckets = [(new_theme, cell_index.pop(theme)) for theme, new_theme in moves]
+    for new_theme, cells in buckets:
+        for cell in cells:
+            cell.text = new_theme
+        cell_index.setdefault(new_theme.strip(), []).extend(cells)
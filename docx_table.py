@@ -0,0 +1,57 @@
+from xml.sax.saxutils import escape
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+# Builds the body rows of the schedule table as raw WordprocessingML and
+# appends them in one go. This avoids table.add_row(), row.cells and
+# cell.merge(), which rebuild the cell grid on every call.
+
+
+def grid_widths(table):
+    return [int(grid_col.get(qn('w:w')) or 0) for grid_col in table._tbl.tblGrid.findall(qn('w:gridCol'))]
+
+
+def cell_xml(text, width, span=1, align=None, border_size=4, font='Calibri', font_size=11):
+    tc_pr = [f'<w:tcW w:w="{width}" w:type="dxa"/>']
+    if span > 1:
+        tc_pr.append(f'<w:gridSpan w:val="{span}"/>')
+    tc_pr.append('<w:tcBorders>' + ''.join(
+        f'<w:{side} w:val="single" w:sz="{border_size}"/>' for side in ('top', 'left', 'bottom', 'right')
+    ) + '</w:tcBorders>')
+    tc_pr.append('<w:vAlign w:val="center"/>')
+
+    p_pr = f'<w:pPr><w:jc w:val="{align}"/></w:pPr>' if align else ''
+    run = ''
+    if text:
+        run = (f'<w:r><w:rPr><w:rFonts w:ascii="{font}" w:hAnsi="{font}"/><w:sz w:val="{font_size * 2}"/></w:rPr>'
+               f'<w:t xml:space="preserve">{escape(text)}</w:t></w:r>')
+    return f'<w:tc><w:tcPr>{"".join(tc_pr)}</w:tcPr><w:p>{p_pr}{run}</w:p></w:tc>'
+
+
+def schedule_rows_xml(days, widths, **cell_options):
+    # Column layout of the schedule table: 0 | 1-5 merged | 6 hours | 7.
+    text_width = sum(widths[1:6])
+    parts = []
+    for day_name, rows in days:
+        parts.append('<w:tr>' + cell_xml(day_name, sum(widths), span=len(widths), align='left', **cell_options) + '</w:tr>')
+        for text, duration in rows:
+            parts.append(
+                '<w:tr>'
+                + cell_xml('', widths[0], **cell_options)
+                + cell_xml(text, text_width, span=5, **cell_options)
+                + cell_xml(duration, widths[6], align='center', **cell_options)
+                + cell_xml('', widths[7], **cell_options)
+                + '</w:tr>'
+            )
+    return ''.join(parts)
+
+
+def append_schedule_rows(table, days, **cell_options):
+    widths = grid_widths(table)
+    if len(widths) != 8:
+        raise ValueError(f"Expected an 8 column schedule table, got {len(widths)} columns")
+
+    fragment = parse_xml(f'<w:tbl {nsdecls("w")}>{schedule_rows_xml(days, widths, **cell_options)}</w:tbl>')
+    tbl = table._tbl
+    for tr in list(fragment):
+        tbl.append(tr)
@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import getpass
+import tempfile
+
+IDENTITY_FILE = os.path.join(os.path.expanduser("~"), ".classeditor", "identity.json")
+NAME_ENV_VAR = "CLASSEDITOR_NAME"
+UNKNOWN_NAME = "Unknown"
+NAME_ORDER_HELP = ("without it: $CLASSEDITOR_NAME, the name saved by an earlier --name or detection, "
+                   "the OS account name, Word's user name, the login name")
+
+_resolved_name = None
+
+
+def load_saved_name(identity_file=IDENTITY_FILE):
+    try:
+        with open(identity_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("name") or None
+    except (OSError, ValueError):
+        return None
+
+
+def save_name(name, identity_file=IDENTITY_FILE):
+    try:
+        os.makedirs(os.path.dirname(identity_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(identity_file), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"name": name}, f, ensure_ascii=False)
+        os.replace(tmp_path, identity_file)
+    except OSError as e:
+        print(f"Could not save user name: {e}")
+
+
+def name_from_env():
+    return os.environ.get(NAME_ENV_VAR) or None
+
+
+def name_from_os_account():
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            name_display = 3
+            size = ctypes.c_ulong(0)
+            ctypes.windll.secur32.GetUserNameExW(name_display, None, ctypes.byref(size))
+            if not size.value:
+                return None
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if ctypes.windll.secur32.GetUserNameExW(name_display, buffer, ctypes.byref(size)):
+                return buffer.value or None
+            return None
+
+        import pwd
+        full_name = pwd.getpwuid(os.getuid()).pw_gecos.split(",")[0].strip()
+        return full_name or None
+    except Exception:
+        return None
+
+
+def name_from_word():
+    from test17 import get_word_username
+    name = get_word_username()
+    return name if name and name != UNKNOWN_NAME else None
+
+
+def name_from_login():
+    try:
+        return getpass.getuser() or None
+    except Exception:
+        return None
+
+
+def resolve_user_name(cli_name=None, use_word=True, identity_file=IDENTITY_FILE):
+    # Resolution order: explicit name, CLASSEDITOR_NAME, saved name, OS
+    # display name, Word's UserName (slow, Windows only), login name. Names
+    # that are stable for this machine are saved so later runs stop at the
+    # file; the environment variable still wins over a saved name.
+    global _resolved_name
+    if cli_name:
+        if cli_name != load_saved_name(identity_file):
+            save_name(cli_name, identity_file)
+        _resolved_name = cli_name
+        return cli_name
+    if _resolved_name:
+        return _resolved_name
+
+    resolvers = [
+        (name_from_env, False),
+        (lambda: load_saved_name(identity_file), False),
+        (name_from_os_account, True),
+    ]
+    if use_word:
+        resolvers.append((name_from_word, True))
+    resolvers.append((name_from_login, False))
+
+    for resolver, persist in resolvers:
+        name = resolver()
+        if name:
+            if persist:
+                save_name(name, identity_file)
+            _resolved_name = name
+            return name
+    return UNKNOWN_NAME
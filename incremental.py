@@ -0,0 +1,281 @@
+import io
+import os
+import json
+import pickle
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+from docx import Document
+from test1 import extract_text_from_pdf, EXTRACTOR_VERSION
+from test2 import remove_lines_before_newest_date, move_timestamps_to_new_line
+from test17 import build_schedule_document
+from pipeline import clean_schedule_lines, split_lines, build_day_schedules, day_stages
+from pdf_cache import file_digest
+from pdf_report import report_from_document, render_report_pdf
+from rules import RuleSet, load_rules
+from identity import resolve_user_name
+from docx_reader import apply_themes_to_document
+
+# The pipeline as a graph of stages. Every stage output is stored under a
+# hash of the content of its inputs and of the parameters it uses, so a
+# rerun only recomputes what is downstream of a real change: a new theme
+# mapping rebuilds the document and the PDF, a new max_hours starts at the
+# day stages, an unchanged PDF never reaches PyPDF2 again.
+
+DEFAULT_STAGE_DIR = os.path.join(os.path.expanduser("~"), ".classeditor", "stages")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+class Stage:
+    def __init__(self, name, func, deps=(), params=(), version=1):
+        self.name = name
+        self.func = func
+        self.deps = deps
+        self.params = params
+        self.version = version
+
+
+def read_pdf_text(pdf_file, extractor):
+    return extract_text_from_pdf(pdf_file)
+
+
+def select_week(schedule_text):
+    return move_timestamps_to_new_line(remove_lines_before_newest_date(schedule_text))
+
+
+# The cleanup rules are a parameter like any other: the stage keys hash
+# the rule lists themselves, and the stages compile exactly those lists.
+def clean_lines(week_text, schedule_rules):
+    return list(clean_schedule_lines(split_lines(week_text), schedule_rules=RuleSet(schedule_rules)))
+
+
+def build_days(lines, max_hours, day_rules):
+    return build_day_schedules(lines, stages=day_stages(max_hours, RuleSet(day_rules)))
+
+
+def build_document(schedule_text, days, include_signature, full_name, themes, year):
+    doc = build_schedule_document(schedule_text, include_signature=include_signature, days=days, full_name=full_name,
+                                  year=year)
+    if themes:
+        apply_themes_to_document(doc, themes)
+    output = io.BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+def render_pdf(document_data, include_signature):
+    header, day_rows = report_from_document(Document(io.BytesIO(document_data)))
+    fd, output_file = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        render_report_pdf(output_file, header, day_rows, include_signature)
+        with open(output_file, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(output_file)
+
+
+STAGES = [
+    Stage("pdf_text", read_pdf_text, deps=("pdf_file",), params=("extractor",)),
+    Stage("week_text", select_week, deps=("pdf_text",)),
+    Stage("lines", clean_lines, deps=("week_text",), params=("schedule_rules",)),
+    Stage("days", build_days, deps=("lines",), params=("max_hours", "day_rules")),
+    Stage("document", build_document, deps=("pdf_text", "days"), params=("include_signature", "full_name", "themes", "year")),
+    Stage("report_pdf", render_pdf, deps=("document",), params=("include_signature",)),
+]
+
+
+def default_params(full_name=None, max_hours=8, include_signature=True, themes=None):
+    rules = load_rules()
+    return {
+        "extractor": EXTRACTOR_VERSION,
+        "schedule_rules": rules["schedule"],
+        "day_rules": rules["days"],
+        "max_hours": max_hours,
+        "include_signature": include_signature,
+        "full_name": full_name,
+        "themes": themes or {},
+        # The document shows the current year, so a new year builds it again.
+        "year": datetime.now().year,
+    }
+
+
+class StageStore:
+    # One pickle per stage run, plus a small file with the digest of its
+    # output so a dry run can follow the graph without loading outputs.
+    def __init__(self, cache_dir=DEFAULT_STAGE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def digest(self, key):
+        try:
+            with open(self.path(key, ".digest"), "r", encoding="ascii") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def load(self, key):
+        path = self.path(key, ".pickle")
+        try:
+            with open(path, "rb") as f:
+                output = pickle.load(f)
+            # The modification time doubles as the LRU timestamp.
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError,
+                IndexError):
+            # Cut short or written by older code: rebuilt like a miss.
+            return None
+        return output
+
+    def store(self, key, output):
+        data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()
+        for suffix, content in ((".pickle", data), (".digest", digest.encode("ascii"))):
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self.path(key, suffix))
+        self.evict()
+        return digest
+
+    def evict(self):
+        # Drops the least recently used outputs until the pickles fit in
+        # max_bytes; the digest goes first so a dry run never plans with an
+        # output that is gone.
+        entries = []
+        total = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".pickle"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename[:-len(".pickle")]))
+            total += stat.st_size
+
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for suffix in (".digest", ".pickle"):
+                try:
+                    os.remove(self.path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith((".pickle", ".digest")):
+                os.remove(os.path.join(self.cache_dir, filename))
+
+
+def stage_key(stage, dep_digests, params):
+    used = {name: params.get(name) for name in stage.params}
+    data = json.dumps([stage.name, stage.version, dep_digests, used], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class IncrementalPipeline:
+    def __init__(self, stages=STAGES, store=None):
+        self.stages = stages
+        self.store = store or StageStore()
+
+    def source_digests(self, sources):
+        return {name: file_digest(path) for name, path in sources.items()}
+
+    def plan(self, sources, params):
+        # Returns (stage, status) in run order: "cached", "rebuild", or
+        # "rebuild?" when an input is rebuilt and may or may not change.
+        digests = self.source_digests(sources)
+        plan = []
+        for stage in self.stages:
+            dep_digests = [digests.get(dep) for dep in stage.deps]
+            if None in dep_digests:
+                plan.append((stage.name, "rebuild?"))
+                digests[stage.name] = None
+                continue
+            digest = self.store.digest(stage_key(stage, dep_digests, params))
+            plan.append((stage.name, "cached" if digest else "rebuild"))
+            digests[stage.name] = digest
+        return plan
+
+    def run(self, sources, params, targets=None):
+        digests = self.source_digests(sources)
+        outputs = dict(sources)
+        rebuilt = []
+        needed = self.needed_stages(targets)
+        for stage in self.stages:
+            if stage.name not in needed:
+                continue
+            key = stage_key(stage, [digests[dep] for dep in stage.deps], params)
+            digest = self.store.digest(key)
+            output = self.store.load(key) if digest else None
+            if output is None:
+                args = [outputs[dep] for dep in stage.deps] + [params[name] for name in stage.params]
+                output = stage.func(*args)
+                digest = self.store.store(key, output)
+                rebuilt.append(stage.name)
+            outputs[stage.name] = output
+            digests[stage.name] = digest
+        return outputs, rebuilt
+
+    def needed_stages(self, targets):
+        if not targets:
+            return {stage.name for stage in self.stages}
+        by_name = {stage.name: stage for stage in self.stages}
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in by_name and name not in needed:
+                needed.add(name)
+                pending.extend(by_name[name].deps)
+        return needed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build a weekly report, recomputing only stages whose inputs changed.")
+    parser.add_argument("pdf_file")
+    parser.add_argument("-o", "--output", default="Weekly_Class_Schedules.docx")
+    parser.add_argument("--pdf", default=None, metavar="PDF_OUTPUT", help="also write the report as PDF")
+    parser.add_argument("--max-hours", type=int, default=8)
+    parser.add_argument("--no-signature", action="store_true")
+    parser.add_argument("--themes", default=None, help="JSON file with a theme mapping to apply")
+    parser.add_argument("--name", default=None)
+    parser.add_argument("--cache-dir", default=DEFAULT_STAGE_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="only show which stages would be rebuilt")
+    parser.add_argument("--clear", action="store_true", help="drop all stored stage outputs first")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    themes = None
+    if args.themes:
+        with open(args.themes, "r", encoding="utf-8") as f:
+            themes = json.load(f)
+    params = default_params(resolve_user_name(args.name), args.max_hours, not args.no_signature, themes)
+    pipeline = IncrementalPipeline(store=StageStore(args.cache_dir))
+    if args.clear:
+        pipeline.store.clear()
+    sources = {"pdf_file": os.path.abspath(args.pdf_file)}
+    targets = ["document", "report_pdf"] if args.pdf else ["document"]
+
+    if args.dry_run:
+        for name, status in pipeline.plan(sources, params):
+            if name in pipeline.needed_stages(targets):
+                print(f"{name:<12} {status}")
+    else:
+        outputs, rebuilt = pipeline.run(sources, params, targets)
+        with open(args.output, "wb") as f:
+            f.write(outputs["document"])
+        if args.pdf:
+            with open(args.pdf, "wb") as f:
+                f.write(outputs["report_pdf"])
+        print(f"Rebuilt: {', '.join(rebuilt) if rebuilt else 'nothing'}")
@@ -0,0 +1,212 @@
+import re
+import PyPDF2
+from model import WEEKDAYS, ClassEntry
+from test2 import extract_dates, convert_to_date
+from test10 import DEFAULT_TIMESTAMP
+from test12 import time_to_minutes
+from test1 import read_newest_week
+from pipeline import SCHEDULE_RULES, build_day_schedule, day_stages
+from pdf_report import text_width
+from profiling import profiler
+
+# Reads the timetable from the text positions on the page instead of the
+# flat page text. Text fragments are grouped into lines by their y
+# position, a line naming two or more weekdays splits the rest of the page
+# into day columns split halfway between the weekday names, and a cell
+# collects lines until its time range. Labels
+# that wrap, LEK lines and teacher names on a line of their own therefore
+# end up in one entry without the repair passes (test2, test8 to test12)
+# the flat text needs. Without a weekday header the page is read as one
+# column and days end at 16:00/16:15, as in test11.
+
+TIME_RANGE_SPLIT = re.compile(r'(\d{2}:\d{2}-\d{2}:\d{2})')
+LINE_TOLERANCE = 2.0
+DAY_END_MARKERS = ('-16:00', '-16:15')
+
+
+def page_fragments(page):
+    # (x, y, text, centre) of every piece of text PyPDF2 shows on the page.
+    # The centre is estimated with the Helvetica widths, which is close
+    # enough to tell columns apart.
+    fragments = []
+
+    def visit(text, cm, tm, font_dict, font_size):
+        text = text.replace("\n", " ").strip()
+        if text:
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            size = font_size * (abs(tm[0] * cm[0]) or 1)
+            fragments.append((x, y, text, x + text_width(text, size) / 2))
+
+    page.extract_text(visitor_text=visit)
+    return fragments
+
+
+def group_lines(fragments):
+    # Top to bottom; fragments within LINE_TOLERANCE of a line's y join it,
+    # left to right.
+    lines = []
+    for x, y, text, _ in sorted(fragments, key=lambda fragment: (-fragment[1], fragment[0])):
+        if lines and abs(lines[-1][0] - y) <= LINE_TOLERANCE:
+            lines[-1][1].append((x, text))
+        else:
+            lines.append((y, [(x, text)]))
+    return [(y, " ".join(text for _, text in sorted(parts))) for y, parts in lines]
+
+
+def weekday_columns(fragments):
+    # Day columns if the fragments name at least two weekdays, as a list of
+    # (left, right, day); otherwise None. Columns meet halfway between the
+    # centres of neighbouring weekday names, the outer ones reach as far
+    # out as their neighbour's boundary is from the centre.
+    centres = {}
+    for _, _, text, centre in fragments:
+        for day in WEEKDAYS:
+            if text.startswith(day) and day not in centres:
+                centres[day] = centre
+    if len(centres) < 2:
+        return None
+    columns = sorted((centre, day) for day, centre in centres.items())
+    bounds = [(left + right) / 2 for (left, _), (right, _) in zip(columns, columns[1:])]
+    bounds = [2 * columns[0][0] - bounds[0]] + bounds + [2 * columns[-1][0] - bounds[-1]]
+    return [(bounds[i], bounds[i + 1], day) for i, (_, day) in enumerate(columns)]
+
+
+def column_day(columns, centre):
+    for left, right, day in columns:
+        if left <= centre < right:
+            return day
+    return None
+
+
+def page_lines(fragments, columns):
+    # (day, text) lines of one page in reading order: everything above the
+    # weekday header first, then each day column from top to bottom. day
+    # is None for lines outside of day columns. Returns the columns in use
+    # so the next page can continue with them.
+    header_y = None
+    for y, text in group_lines(fragments):
+        line_columns = weekday_columns([fragment for fragment in fragments if abs(fragment[1] - y) <= LINE_TOLERANCE])
+        if line_columns:
+            columns, header_y = line_columns, y
+            break
+
+    if columns is None:
+        return [(None, text) for _, text in group_lines(fragments)], None
+
+    lines = []
+    body = []
+    for fragment in fragments:
+        if header_y is not None and fragment[1] >= header_y - LINE_TOLERANCE:
+            lines.append(fragment)
+        else:
+            body.append(fragment)
+    result = [(None, text) for _, text in group_lines(lines)]
+    by_day = {}
+    for fragment in body:
+        day = column_day(columns, fragment[3])
+        if day is not None:
+            by_day.setdefault(day, []).append(fragment)
+    for _, _, day in columns:
+        result.extend((day, text) for _, text in group_lines(by_day.get(day, [])))
+    return result, columns
+
+
+def read_layout(pdf_file, first_page=0, last_page=None):
+    with profiler.stage('layout extract pdf', pdf=pdf_file) as record:
+        lines = []
+        columns = None
+        with open(pdf_file, "rb") as file:
+            reader = PyPDF2.PdfReader(file)
+            stop = len(reader.pages) if last_page is None else min(last_page, len(reader.pages))
+            for i in range(max(first_page, 0), stop):
+                page, columns = page_lines(page_fragments(reader.pages[i]), columns)
+                lines.extend(page)
+        record['lines_out'] = len(lines)
+        return lines
+
+
+def newest_week_lines(lines):
+    # Same cut as test2.remove_lines_before_newest_date: everything up to
+    # the first line with the newest date goes.
+    dates = [convert_to_date(date) for _, text in lines for date in extract_dates(text)]
+    if not dates:
+        return lines
+    newest_date = max(dates).strftime("%d.%m.%Y")
+    for i, (_, text) in enumerate(lines):
+        if newest_date in text:
+            return lines[i + 1:]
+    return lines
+
+
+def iter_cells(lines):
+    # (day, label, time range) per timetable cell. Lines are cleaned with
+    # the schedule rules first; a label left without a time range when its
+    # column ends gets the whole day, like test10 does. Text above the day
+    # columns (the weekday header) is not a cell.
+    label = []
+    day = None
+    for line_day, text in lines:
+        if line_day != day:
+            if label and day is not None:
+                yield day, " ".join(label), DEFAULT_TIMESTAMP
+            label = []
+            day = line_day
+        for piece in SCHEDULE_RULES.apply([text]):
+            for i, part in enumerate(TIME_RANGE_SPLIT.split(piece)):
+                part = part.strip()
+                if i % 2:
+                    yield day, " ".join(label), part
+                    label = []
+                elif part:
+                    label.append(part)
+    if label:
+        yield day, " ".join(label), DEFAULT_TIMESTAMP
+
+
+def day_entries(cells):
+    # Entries per weekday. Cells outside of day columns are counted into
+    # days the way test11 does it, closing a day at 16:00 or 16:15.
+    days = {}
+    chunk_count = 0
+    for day, label, time_range in cells:
+        if not label:
+            continue
+        start_time, end_time = time_range.split('-')
+        entry = ClassEntry.from_label(label, time_to_minutes(end_time) - time_to_minutes(start_time))
+        if day is None:
+            days.setdefault(WEEKDAYS[chunk_count % len(WEEKDAYS)], []).append(entry)
+            if any(marker in time_range for marker in DAY_END_MARKERS):
+                chunk_count += 1
+        else:
+            days.setdefault(day, []).append(entry)
+    return days
+
+
+def layout_text(lines):
+    return "".join(text + "\n" for _, text in lines)
+
+
+def load_week_layout(pdf_file, max_hours=8, newest_week_only=False):
+    # Returns (schedule_text, days) like pipeline.load_week. schedule_text
+    # is the page text in reading order, for the header fields. With
+    # newest_week_only the pages are chosen as in
+    # test1.extract_newest_week_text.
+    if newest_week_only:
+        def read_pages(first_page):
+            lines = read_layout(pdf_file, first_page)
+            return layout_text(lines), lines
+        lines = read_newest_week(pdf_file, read_pages)
+    else:
+        lines = read_layout(pdf_file)
+    schedule_text = layout_text(lines)
+    with profiler.stage('layout cells'):
+        days = day_entries(iter_cells(newest_week_lines(lines)))
+    stages = day_stages(max_hours)[1:]
+    schedules = []
+    for day in WEEKDAYS:
+        if day not in days:
+            print(f"Warning: No schedule found for {day}. Skipping.")
+            continue
+        schedules.append(build_day_schedule(day, days[day], stages))
+    return schedule_text, schedules
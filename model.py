@@ -0,0 +1,68 @@
+import re
+
+WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
+
+DURATION_PATTERN = re.compile(r'(?:(\d+)h)?\s*(?:(\d+)min)?')
+
+
+class ClassEntry:
+    __slots__ = ("subject", "instructor", "minutes")
+
+    def __init__(self, subject, instructor="", minutes=0):
+        self.subject = subject
+        self.instructor = instructor
+        self.minutes = minutes
+
+    @classmethod
+    def from_label(cls, label, minutes=0):
+        parts = label.replace('Class: ', '').split(' / ')
+        return cls(parts[0].strip(), parts[1].strip() if len(parts) > 1 else '', minutes)
+
+    @property
+    def label(self):
+        return f"{self.subject} / {self.instructor}" if self.instructor else self.subject
+
+    @property
+    def hours(self):
+        return self.minutes // 60
+
+    def to_line(self):
+        return f"Class: {self.label} | Duration: {self.minutes // 60}h {self.minutes % 60}min"
+
+    @classmethod
+    def from_line(cls, line):
+        label, duration_str = line.split(' | ', 1)
+        match = DURATION_PATTERN.fullmatch(duration_str.replace('Duration:', '').strip())
+        if not match:
+            raise ValueError(f"Invalid duration: {duration_str}")
+        hours, minutes = match.groups()
+        return cls.from_label(label, int(hours or 0) * 60 + int(minutes or 0))
+
+    def __eq__(self, other):
+        return (isinstance(other, ClassEntry) and
+                (self.subject, self.instructor, self.minutes) == (other.subject, other.instructor, other.minutes))
+
+    def __repr__(self):
+        return f"ClassEntry({self.subject!r}, {self.instructor!r}, {self.minutes})"
+
+
+class DaySchedule:
+    __slots__ = ("day", "entries")
+
+    def __init__(self, day, entries=None):
+        self.day = day
+        self.entries = entries if entries is not None else []
+
+    @property
+    def total_minutes(self):
+        return sum(entry.minutes for entry in self.entries)
+
+    def to_text(self):
+        return "".join(entry.to_line() + "\n" for entry in self.entries)
+
+    @classmethod
+    def from_text(cls, day, text):
+        return cls(day, [ClassEntry.from_line(line) for line in text.splitlines() if ' | ' in line])
+
+    def __repr__(self):
+        return f"DaySchedule({self.day!r}, {self.entries!r})"
@@ -0,0 +1,124 @@
+import io
+import os
+import argparse
+import tempfile
+import zipfile
+from lxml import etree
+from test17 import build_schedule_document
+from identity import resolve_user_name, NAME_ORDER_HELP
+from pipeline import load_week
+from pdf_cache import PdfTextCache
+
+DOCUMENT_PART = "word/document.xml"
+PAGE_BREAK_XML = ('<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                  '<w:r><w:br w:type="page"/></w:r></w:p>')
+
+
+def document_shell(doc):
+    # Start and end tags of word/document.xml with an empty body, so the
+    # weeks can be written in between without holding them all at once.
+    root = doc.element
+    shell = etree.Element(root.tag, nsmap=root.nsmap)
+    for name, value in root.attrib.items():
+        shell.set(name, value)
+    body = etree.SubElement(shell, root.body.tag)
+    body.text = "BODY"
+    xml = etree.tostring(shell, xml_declaration=True, encoding="UTF-8", standalone=True).decode("utf-8")
+    return xml.split("BODY", 1)
+
+
+def body_blocks(doc):
+    section = doc.element.body.sectPr
+    return [child for child in doc.element.body if child is not section], section
+
+
+def create_multi_week_document(weeks, output_file, include_signature=True, full_name=None):
+    # The document is written to a temporary file next to output_file and
+    # only moved there once every week is in, so a failed run leaves no
+    # empty or broken .docx behind.
+    if full_name is None:
+        full_name = resolve_user_name()
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_file)), suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out_zip:
+            week_count = write_weeks(out_zip, weeks, include_signature, full_name)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return week_count
+
+
+def write_weeks(out_zip, weeks, include_signature, full_name):
+    # Each week is built as its own small document and only its body XML is
+    # streamed into the output ZIP, so memory stays flat however many weeks
+    # are combined. The first week also provides styles, settings and the
+    # other package parts.
+    week_count = 0
+    section_xml = b""
+    document_stream = None
+    try:
+        for schedule_text, days in weeks:
+            doc = build_schedule_document(schedule_text, include_signature=include_signature, days=days,
+                                          full_name=full_name)
+            blocks, section = body_blocks(doc)
+
+            if document_stream is None:
+                template = io.BytesIO()
+                doc.save(template)
+                with zipfile.ZipFile(template) as template_zip:
+                    for item in template_zip.infolist():
+                        if item.filename != DOCUMENT_PART:
+                            out_zip.writestr(item, template_zip.read(item.filename))
+                opening, closing = document_shell(doc)
+                section_xml = etree.tostring(section) if section is not None else b""
+                document_stream = out_zip.open(DOCUMENT_PART, "w", force_zip64=True)
+                document_stream.write(opening.encode("utf-8"))
+            else:
+                document_stream.write(PAGE_BREAK_XML.encode("utf-8"))
+
+            for block in blocks:
+                document_stream.write(etree.tostring(block, encoding="UTF-8"))
+            week_count += 1
+
+        if document_stream is None:
+            raise ValueError("No weeks to write.")
+        document_stream.write(section_xml)
+        document_stream.write(closing.encode("utf-8"))
+    finally:
+        # The ZIP cannot be closed while the stream is open, which would
+        # hide the original error.
+        if document_stream is not None:
+            document_stream.close()
+    return week_count
+
+
+def iter_weeks_from_pdfs(pdf_files, cache=None, extract_workers=1):
+    for pdf_file in pdf_files:
+        try:
+            yield load_week(pdf_file, cache=cache, extract_workers=extract_workers)
+        except Exception as e:
+            print(f"Skipping {pdf_file}: {e}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Combine many weekly timetables into one Ausbildungsnachweis.")
+    parser.add_argument("pdf_files", nargs="+", help="timetable PDFs in the order the weeks should appear")
+    parser.add_argument("-o", "--output", default="Ausbildungsnachweis.docx", help="combined DOCX file")
+    parser.add_argument("--name", default=None, help="trainee name for the header tables; " + NAME_ORDER_HELP)
+    parser.add_argument("--extract-workers", type=int, default=1, help="processes used to extract PDF pages")
+    parser.add_argument("--no-cache", action="store_true", help="always extract the PDF text again")
+    parser.add_argument("--no-signature", action="store_true", help="leave out the signature sections")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    cache = None if args.no_cache else PdfTextCache()
+    pdf_files = [os.path.abspath(pdf_file) for pdf_file in args.pdf_files]
+    weeks = iter_weeks_from_pdfs(pdf_files, cache=cache, extract_workers=args.extract_workers)
+    count = create_multi_week_document(weeks, args.output, include_signature=not args.no_signature,
+                                       full_name=resolve_user_name(args.name))
+    print(f"Wrote {count} weeks to {args.output}")
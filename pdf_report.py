@@ -0,0 +1,277 @@
+import os
+from datetime import datetime
+from docx_reader import iter_docx_rows, iter_document_rows
+from test17 import extract_kw_numbers, extract_dates_and_class, schedule_row_texts, class_info_from_entries
+
+# A small PDF writer for the weekly report. It only needs the standard
+# Helvetica font, lines and text, so no Word installation or third-party
+# PDF library is required.
+
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 72
+FONT_SIZE = 10
+SMALL_FONT_SIZE = 7
+CELL_PADDING = 4
+LINE_WIDTH = 0.5
+
+SCHEDULE_HEADER = ('Betriebliche Tätigkeiten, Unterweisungen bzw. überbetriebliche Unterweisungen, '
+                   'betrieblicher Unterricht, sonstige Schulungen, Themen des Berufsschulunterrichts')
+PLAN_HEADER = 'Lfd. Nummer: Bezug zum Ausbildungs-rahmenplan (optionale Angabe)'
+SIGNATURE_LINES = [
+    ("Datum, Unterschrift Auszubildende/r", "Datum, Unterschrift"),
+    ("", "Ausbildender oder Ausbilderin/Ausbilder"),
+]
+
+# Helvetica advance widths (1/1000 em) for the printable ASCII range.
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+EXTRA_WIDTHS = {'Ä': 667, 'Ö': 778, 'Ü': 722, 'ä': 556, 'ö': 556, 'ü': 556, 'ß': 611, '€': 556}
+
+
+def char_width(char):
+    code = ord(char)
+    if 32 <= code <= 126:
+        return HELVETICA_WIDTHS[code - 32]
+    return EXTRA_WIDTHS.get(char, 556)
+
+
+def text_width(text, font_size):
+    return sum(char_width(char) for char in text) * font_size / 1000
+
+
+def wrap_text(text, width, font_size):
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, font_size) <= width or not line:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+            # Words longer than the cell are broken by character.
+            while text_width(line, font_size) > width and len(line) > 1:
+                cut = len(line)
+                while cut > 1 and text_width(line[:cut], font_size) > width:
+                    cut -= 1
+                lines.append(line[:cut])
+                line = line[cut:]
+        lines.append(line)
+    return lines
+
+
+def pdf_string(text):
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class PdfCanvas:
+    def __init__(self):
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self.commands = []
+        self.pages.append(self.commands)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def line(self, x1, y1, x2, y2):
+        self.commands.append(f"{x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S".encode("ascii"))
+
+    def rect(self, x, y, width, height):
+        self.commands.append(f"{x:.2f} {y:.2f} {width:.2f} {height:.2f} re S".encode("ascii"))
+
+    def text(self, x, y, text, font_size):
+        self.commands.append(f"BT /F1 {font_size} Tf {x:.2f} {y:.2f} Td ".encode("ascii")
+                             + pdf_string(text) + b" Tj ET")
+
+    def ensure_space(self, height):
+        if self.y - height < MARGIN and self.y < PAGE_HEIGHT - MARGIN:
+            self.new_page()
+
+    def save(self, output_file):
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        ]
+        page_ids = []
+        for commands in self.pages:
+            stream = b"\n".join([f"{LINE_WIDTH} w".encode("ascii")] + commands)
+            objects.append(b"<< /Length " + str(len(stream)).encode("ascii") + b" >>\nstream\n" + stream + b"\nendstream")
+            content_id = len(objects)
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode("ascii")
+            )
+            page_ids.append(len(objects))
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(output))
+            output += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+        xref_offset = len(output)
+        output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+        for offset in offsets:
+            output += f"{offset:010d} 00000 n \n".encode("ascii")
+        output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+
+        with open(output_file, "wb") as f:
+            f.write(output)
+
+
+def draw_table_row(canvas, column_widths, cells):
+    # cells: (first column, span, text, alignment, font size)
+    layouts = []
+    for column, span, text, align, font_size in cells:
+        width = sum(column_widths[column:column + span])
+        lines = wrap_text(text, width - 2 * CELL_PADDING, font_size) if text else []
+        layouts.append((column, width, lines, align, font_size))
+    height = max([len(lines) * font_size * 1.2 for _, _, lines, _, font_size in layouts] + [FONT_SIZE * 1.2])
+    height += 2 * CELL_PADDING
+
+    canvas.ensure_space(height)
+    top = canvas.y
+    for column, width, lines, align, font_size in layouts:
+        x = MARGIN + sum(column_widths[:column])
+        canvas.rect(x, top - height, width, height)
+        leading = font_size * 1.2
+        y = top - (height - len(lines) * leading) / 2 - font_size
+        for line in lines:
+            if align == "center":
+                line_x = x + (width - text_width(line, font_size)) / 2
+            elif align == "right":
+                line_x = x + width - CELL_PADDING - text_width(line, font_size)
+            else:
+                line_x = x + CELL_PADDING
+            canvas.text(line_x, y, line, font_size)
+            y -= leading
+    canvas.y = top - height
+
+
+def report_header(schedule_text, full_name):
+    class_name, oldest_date, newest_date = extract_dates_and_class(schedule_text)
+    return {
+        "name": full_name,
+        "year": str(datetime.now().year),
+        "class_name": class_name,
+        "from": oldest_date.strftime("%d.%m.%Y") if oldest_date else '',
+        "to": newest_date.strftime("%d.%m.%Y") if newest_date else '',
+        "kw": "".join(extract_kw_numbers(schedule_text)),
+    }
+
+
+def report_days(days, updated_themes=None):
+    updated_themes = updated_themes or {}
+    rows = []
+    for day_schedule in days:
+        class_info = class_info_from_entries(day_schedule.entries)
+        if class_info:
+            rows.append((day_schedule.day, [(updated_themes.get(text, text), duration)
+                                            for text, duration in schedule_row_texts(class_info)]))
+    return rows
+
+
+def report_from_docx(doc_path):
+    return report_from_rows(iter_docx_rows(doc_path))
+
+
+def report_from_document(doc):
+    return report_from_rows(iter_document_rows(doc))
+
+
+def report_from_rows(rows):
+    # rows: (table number, cell texts) as read by docx_reader. Table 0 is
+    # the header, table 1 the schedule with its column header row first.
+    header_rows = []
+    day_rows = []
+    schedule_rows = 0
+    for table_number, cells in rows:
+        if table_number == 0:
+            header_rows.append(cells)
+            continue
+        if table_number != 1:
+            break
+        schedule_rows += 1
+        if schedule_rows == 1 or len(cells) < 7:
+            continue
+        if all(text == cells[0] for text in cells) and cells[0]:
+            day_rows.append((cells[0].strip(), []))
+        elif day_rows:
+            day_rows[-1][1].append((cells[1].strip(), cells[6].strip()))
+
+    header = {
+        "name": header_rows[0][2],
+        "year": header_rows[1][1],
+        "class_name": header_rows[1][3],
+        "from": header_rows[2][1],
+        "to": header_rows[2][3],
+        "kw": header_rows[2][5],
+    }
+    return header, day_rows
+
+
+def render_report_pdf(output_file, header, day_rows, include_signature=True):
+    canvas = PdfCanvas()
+    table_width = PAGE_WIDTH - 2 * MARGIN
+
+    # Helvetica runs wider than Calibri, so the label columns get more room
+    # than in the evenly split DOCX table.
+    weights = [1.5, 1, 0.7, 1, 0.6, 0.6]
+    widths = [table_width * weight / sum(weights) for weight in weights]
+    draw_table_row(canvas, widths, [(0, 2, 'Name der/des Auszubildenden:', None, FONT_SIZE),
+                                    (2, 4, header["name"], None, FONT_SIZE)])
+    draw_table_row(canvas, widths, [(0, 1, 'Ausbildungsjahr:', None, FONT_SIZE),
+                                    (1, 1, header["year"], None, FONT_SIZE),
+                                    (2, 1, 'Abteilung:', None, FONT_SIZE),
+                                    (3, 3, header["class_name"], None, FONT_SIZE)])
+    draw_table_row(canvas, widths, [(0, 1, 'Ausbildungswoche vom:', None, FONT_SIZE),
+                                    (1, 1, header["from"], None, FONT_SIZE),
+                                    (2, 1, 'bis:', None, FONT_SIZE),
+                                    (3, 1, header["to"], None, FONT_SIZE),
+                                    (4, 1, 'Nr.:', "right", FONT_SIZE),
+                                    (5, 1, header["kw"], None, FONT_SIZE)])
+
+    widths = [table_width / 8] * 8
+    draw_table_row(canvas, widths, [(0, 1, '', None, FONT_SIZE),
+                                    (1, 5, SCHEDULE_HEADER, None, FONT_SIZE),
+                                    (6, 1, 'Stunden', None, FONT_SIZE),
+                                    (7, 1, PLAN_HEADER, None, SMALL_FONT_SIZE)])
+    for day_name, rows in day_rows:
+        draw_table_row(canvas, widths, [(0, 8, day_name, None, FONT_SIZE)])
+        for text, duration in rows:
+            draw_table_row(canvas, widths, [(0, 1, '', None, FONT_SIZE),
+                                            (1, 5, text, None, FONT_SIZE),
+                                            (6, 1, duration, "center", FONT_SIZE),
+                                            (7, 1, '', None, FONT_SIZE)])
+
+    if include_signature:
+        leading = FONT_SIZE * 1.2
+        canvas.ensure_space(3 * leading + len(SIGNATURE_LINES) * leading)
+        y = canvas.y - 3 * leading
+        canvas.line(MARGIN, y, PAGE_WIDTH - MARGIN, y)
+        for left, right in SIGNATURE_LINES:
+            y -= leading
+            canvas.text(MARGIN, y, left, FONT_SIZE)
+            canvas.text(MARGIN + table_width / 2, y, right, FONT_SIZE)
+        canvas.y = y
+
+    canvas.save(output_file)
+    return output_file
+
+
+def pdf_output_path(doc_path, schedule_text):
+    kw_numbers = extract_kw_numbers(schedule_text)
+    kw_label = "_".join(kw_numbers) if kw_numbers else "KW_Unknown"
+    return os.path.splitext(doc_path)[0] + f"_{kw_label}.pdf"
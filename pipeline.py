@@ -0,0 +1,176 @@
+import os
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from test1 import extract_text_from_pdf, extract_newest_week_text
+from test2 import remove_lines_before_newest_date, move_timestamps_to_new_line
+from test8 import iter_merge_LEK_with_next_line
+from test9 import iter_merge_teacher_names
+from test10 import iter_add_timestamp_to_schedule
+from test11Wdays import extract_schedules, split_schedule_days
+from test12 import parse_day_entries
+from test13 import merge_entries
+from test14 import remove_mittagspause_entries
+from test15 import round_day_hours
+from test16_fix_praxis import remove_zero_duration_entries
+from test17 import create_schedule_document
+from rules import load_rule_sets
+from model import WEEKDAYS, DaySchedule
+from profiling import profiler
+
+SCHEDULE_RULES = load_rule_sets()['schedule']
+
+
+
+def cleanup_stages(schedule_rules):
+    # Each stage keeps the file name it had in the file-based chain, so
+    # debug dumps line up with what process_schedule_steps used to leave
+    # behind. The rule set covers what used to be test3 to test7.
+    return [
+        ('schedule7.txt', 'test3-7 rules', schedule_rules.apply),
+        ('schedule8.txt', 'test8 merge LEK', iter_merge_LEK_with_next_line),
+        ('schedule9.txt', 'test9 merge teachers', iter_merge_teacher_names),
+        ('schedule10.txt', 'test10 timestamps', iter_add_timestamp_to_schedule),
+    ]
+
+
+def dump_lines(lines, file_path):
+    lines = list(lines)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write("\n".join(lines))
+    return lines
+
+
+def clean_schedule_lines(lines, debug_dir=None, schedule_rules=SCHEDULE_RULES):
+    for dump_name, stage_name, stage in cleanup_stages(schedule_rules):
+        lines = profiler.run_lines(stage_name, stage, lines)
+        if debug_dir:
+            lines = dump_lines(lines, os.path.join(debug_dir, dump_name))
+    return lines
+
+
+def split_lines(text):
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def clean_schedule_text(text, debug_dir=None):
+    return "\n".join(clean_schedule_lines(split_lines(text), debug_dir))
+
+
+def process_schedule_file(input_file='schedule2.txt', output_file='schedule10.txt', debug_dir=None):
+    with open(input_file, 'r', encoding='utf-8') as file:
+        lines = (line.rstrip("\n") for line in file)
+        cleaned_text = "\n".join(clean_schedule_lines(lines, debug_dir))
+
+    with open(output_file, 'w', encoding='utf-8') as file:
+        file.write(cleaned_text)
+
+
+DAY_STAGES = [
+    ('test12 parse entries', parse_day_entries),
+    ('test13 merge entries', merge_entries),
+    ('test14 mittagspause', remove_mittagspause_entries),
+    ('test15 round hours', round_day_hours),
+    ('test16 zero durations', remove_zero_duration_entries),
+]
+
+
+def build_day_schedule(day, lines, stages=DAY_STAGES):
+    # The whole day chain for one day, so days can run independently.
+    # Callers that already have entries pass the stages after test12.
+    entries = lines
+    for stage_name, stage in stages:
+        entries = profiler.call(stage_name, stage, entries)
+    return DaySchedule(day, entries)
+
+
+def run_day_tasks(task, day_args, max_workers=1):
+    if not max_workers or max_workers <= 1 or len(day_args) <= 1:
+        return [task(*args) for args in day_args]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(day_args))) as executor:
+        return list(executor.map(lambda args: task(*args), day_args))
+
+
+def day_stages(max_hours=8, day_rules=None):
+    # DAY_STAGES with test15 rounding to max_hours and, if day_rules is
+    # given, test14 using it instead of the rules loaded at import.
+    bound = {round_day_hours: partial(round_day_hours, max_hours=max_hours)}
+    if day_rules is not None:
+        bound[remove_mittagspause_entries] = partial(remove_mittagspause_entries, day_rules=day_rules)
+    return [(stage_name, bound.get(stage, stage)) for stage_name, stage in DAY_STAGES]
+
+
+def build_day_schedules(lines, max_workers=1, stages=DAY_STAGES):
+    days = profiler.call('test11 split days', split_schedule_days, lines)
+    day_args = []
+    for day in WEEKDAYS:
+        if day not in days:
+            print(f"Warning: No schedule found for {day}. Skipping.")
+            continue
+        day_args.append((day, days[day], stages))
+    return run_day_tasks(build_day_schedule, day_args, max_workers)
+
+
+def day_file_text(schedule):
+    # Same lines the file stages leave behind after test16.
+    return "".join(f"Class: {entry.label} | Duration: {entry.hours}\n" for entry in schedule.entries)
+
+
+def process_day_file(file_path, day, stages=DAY_STAGES):
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+    schedule = build_day_schedule(day, lines, stages)
+    with open(file_path, 'w') as file:
+        file.write(day_file_text(schedule))
+    return schedule
+
+
+def process_day_files(folder_path='days', max_hours=8, max_workers=len(WEEKDAYS)):
+    # Replaces the five folder passes of test12 to test16, which were
+    # removed: every day file is read and written once, and the days run on
+    # a thread pool so their file I/O overlaps.
+    stages = day_stages(max_hours)
+    day_args = []
+    for i, day in enumerate(WEEKDAYS, 1):
+        file_path = os.path.join(folder_path, f"{i}_{day}_schedule.txt")
+        if os.path.exists(file_path):
+            day_args.append((file_path, day, stages))
+        else:
+            print(f"Warning: No schedule found for {day}. Skipping.")
+    return run_day_tasks(process_day_file, day_args, max_workers)
+
+
+def finalize_schedule(output_file='Weekly_Class_Schedules.docx', include_signature=True, use_day_files=False,
+                      full_name=None):
+    if use_day_files:
+        profiler.call('test11 split days', extract_schedules, 'schedule10.txt')
+        os.remove('schedule10.txt')
+        days = process_day_files('days')
+        create_schedule_document(input_file='schedule.txt', output_file=output_file,
+                                 include_signature=include_signature, days=days, full_name=full_name)
+        return
+
+    # In memory the days stay on one thread: the stages are pure Python
+    # under the GIL and a pool only adds its start-up cost (about twice the
+    # time for a week).
+    with open('schedule10.txt', 'r', encoding='utf-8') as file:
+        days = build_day_schedules(file.readlines())
+    os.remove('schedule10.txt')
+    create_schedule_document(input_file='schedule.txt', output_file=output_file,
+                             include_signature=include_signature, days=days, full_name=full_name)
+
+
+def build_week(schedule_text, max_hours=8):
+    with profiler.stage('test2 newest week', bytes_in=lambda: len(schedule_text.encode("utf-8"))):
+        content = move_timestamps_to_new_line(remove_lines_before_newest_date(schedule_text))
+    return build_day_schedules(clean_schedule_lines(split_lines(content)), stages=day_stages(max_hours))
+
+
+def load_week(pdf_file, cache=None, extract_workers=1, max_hours=8, newest_week_only=False):
+    if newest_week_only:
+        schedule_text = extract_newest_week_text(pdf_file, max_workers=extract_workers, cache=cache)
+    else:
+        schedule_text = extract_text_from_pdf(pdf_file, max_workers=extract_workers, cache=cache)
+    return schedule_text, build_week(schedule_text, max_hours)
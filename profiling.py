@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+# Records wall time, CPU time, sizes and peak allocations per pipeline
+# stage. Disabled by default, in which case stage() costs next to nothing.
+# Results are written as JSON lines and in the Chrome trace format, which
+# chrome://tracing and Perfetto open directly.
+#
+# tracemalloc only has one peak for the whole process, so peak_bytes is
+# left out of stages that overlap with a stage on another thread (the day
+# thread pool, the GUI worker next to the main thread).
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.events = []
+        self.origin = time.perf_counter()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.open_frames = []
+
+    def enable(self, trace_memory=True):
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.origin = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextmanager
+    def stage(self, name, **info):
+        # Yields a dict the caller can add counts to (lines_in, bytes_out,
+        # ...). Exceptions are recorded on the stage and re-raised. Values in
+        # info may be callables, which are only called when profiling, so
+        # sizes cost nothing in a normal run.
+        if not self.enabled:
+            yield {}
+            return
+
+        record = {"stage": name}
+        record.update((key, value() if callable(value) else value) for key, value in info.items())
+        stack = self.stack()
+        frame = {"child_peak": 0, "thread": threading.get_ident(), "shared": False, "memory_before": 0}
+        if self.trace_memory:
+            with self.lock:
+                if any(other["thread"] != frame["thread"] for other in self.open_frames):
+                    for other in self.open_frames:
+                        other["shared"] = True
+                    frame["shared"] = True
+                else:
+                    current, peak = tracemalloc.get_traced_memory()
+                    # The reset below drops the enclosing stage's peak so
+                    # far, so it is kept with the child peaks.
+                    if stack:
+                        stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+                    frame["memory_before"] = current
+                    tracemalloc.reset_peak()
+                self.open_frames.append(frame)
+        stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.thread_time() - cpu_start
+            record["start_s"] = wall_start - self.origin
+            record["thread"] = threading.current_thread().name
+            stack.pop()
+            if self.trace_memory:
+                with self.lock:
+                    self.open_frames = [other for other in self.open_frames if other is not frame]
+                    if not frame["shared"]:
+                        # A nested stage resets the peak, so its own peak is
+                        # carried up to the enclosing stage.
+                        peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+                        record["peak_bytes"] = max(peak - frame["memory_before"], 0)
+                        if stack:
+                            stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+            self.events.append(record)
+
+    def call(self, name, func, *args, **kwargs):
+        if not self.enabled:
+            return func(*args, **kwargs)
+        with self.stage(name):
+            return func(*args, **kwargs)
+
+    def run_lines(self, name, func, lines):
+        # Runs a line stage to completion so its time is not spread over the
+        # stages that consume it lazily.
+        if not self.enabled:
+            return func(lines)
+        lines = list(lines)
+        with self.stage(name, lines_in=len(lines), bytes_in=text_size(lines)) as record:
+            lines = list(func(lines))
+            record["lines_out"] = len(lines)
+            record["bytes_out"] = text_size(lines)
+        return lines
+
+    def write_jsonl(self, output_file):
+        with open(output_file, "w", encoding="utf-8") as f:
+            for record in self.events:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_chrome_trace(self, output_file):
+        pid = os.getpid()
+        thread_ids = {}
+        trace_events = []
+        for record in self.events:
+            tid = thread_ids.setdefault(record["thread"], len(thread_ids) + 1)
+            args = {key: value for key, value in record.items() if key not in ("stage", "start_s", "wall_s", "thread")}
+            trace_events.append({
+                "name": record["stage"],
+                "cat": "error" if "error" in record else "stage",
+                "ph": "X",
+                "ts": record["start_s"] * 1e6,
+                "dur": record["wall_s"] * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        for thread_name, tid in thread_ids.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                                 "args": {"name": thread_name}})
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, prefix):
+        if not self.events:
+            return
+        self.write_jsonl(prefix + ".jsonl")
+        self.write_chrome_trace(prefix + ".trace.json")
+        print(f"Profile written to {prefix}.jsonl and {prefix}.trace.json")
+
+
+def text_size(lines):
+    return sum(len(line.encode("utf-8")) + 1 for line in lines)
+
+
+def file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+profiler = Profiler()
+stage = profiler.stage
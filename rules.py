@@ -0,0 +1,136 @@
+import os
+import re
+import sys
+import json
+
+
+def program_dir():
+    # Next to the exe when built with PyInstaller, next to the scripts
+    # otherwise, so the rules do not depend on the working directory.
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+RULES_FILE = os.path.join(program_dir(), "rules.json")
+
+# Rules run in order on every line. A rewrite may split a line by
+# inserting "\n"; the pieces then continue with the rules that follow it.
+# Patterns only ever see one line: unlike the old test7, which ran on the
+# whole file, a \s* can no longer match the line break the Uhr rewrite
+# inserted and pull the next line up ("Mittagspause" + "min 10:00" stays
+# two lines). benchmarks/check_rules.py keeps that case.
+DEFAULT_RULES = {
+    "schedule": [
+        {"drop_prefix": ["Teams"]},
+        {"drop_keyword": ["(+"]},
+        {"rewrite": r"Uhr([A-Za-z0-9 ]+)", "replacement": r"Uhr\n\1"},
+        {"remove": ["Uhr"]},
+        {"drop_keyword": ["Theorieunterricht", "Konsultation"]},
+        {"rewrite": r"(Unterrichtsfrei|Sonderveranstaltung|Praxisunterricht|Mittagspause)\d*\s*min?",
+         "replacement": r"\1"},
+        {"rewrite": r"(Praxisunterricht)t?\b.*?\d*\s*mins?", "replacement": r"\1", "ignore_case": True},
+    ],
+    "days": [
+        {"drop_keyword": ["Mittagspause"]},
+    ],
+}
+
+
+def compile_drop(rules):
+    parts = []
+    prefixes = [re.escape(p) for rule in rules for p in rule.get("drop_prefix", [])]
+    keywords = [re.escape(k) for rule in rules for k in rule.get("drop_keyword", [])]
+    if prefixes:
+        parts.append("^(?:" + "|".join(prefixes) + ")")
+    if keywords:
+        parts.append("|".join(keywords))
+    # An empty pattern would match, and drop, every line.
+    return re.compile("|".join(parts)) if parts else None
+
+
+def compile_rules(rules):
+    # Neighbouring drop rules and neighbouring removals are folded into one
+    # alternation each, so a line is scanned once per group instead of once
+    # per keyword.
+    phases = []
+    group = []
+    for rule in rules + [{}]:
+        kind = rule_kind(rule)
+        if group and kind != rule_kind(group[0]):
+            if rule_kind(group[0]) == "drop":
+                pattern = compile_drop(group)
+                if pattern:
+                    phases.append(("drop", pattern, None))
+            else:
+                words = [re.escape(w) for r in group for w in r["remove"]]
+                if words:
+                    phases.append(("sub", re.compile("|".join(words)), ""))
+            group = []
+        if kind in ("drop", "remove"):
+            group.append(rule)
+        elif kind == "rewrite":
+            if not rule["rewrite"]:
+                raise ValueError(f"Empty rewrite pattern: {rule}")
+            flags = re.IGNORECASE if rule.get("ignore_case") else 0
+            phases.append(("sub", re.compile(rule["rewrite"], flags), rule.get("replacement", "")))
+        elif rule:
+            raise ValueError(f"Unknown rule: {rule}")
+    return phases
+
+
+def rule_kind(rule):
+    if "drop_prefix" in rule or "drop_keyword" in rule:
+        return "drop"
+    if "remove" in rule:
+        return "remove"
+    if "rewrite" in rule:
+        return "rewrite"
+    return None
+
+
+class RuleSet:
+    def __init__(self, rules):
+        self.phases = compile_rules(rules)
+
+    def apply(self, lines):
+        for line in lines:
+            yield from self.apply_line(line)
+
+    def drops(self, line):
+        return next(self.apply_line(line), None) is None
+
+    def apply_line(self, line, start=0):
+        for index in range(start, len(self.phases)):
+            kind, pattern, replacement = self.phases[index]
+            if kind == "drop":
+                if pattern.search(line):
+                    return
+                continue
+
+            line = pattern.sub(replacement, line)
+            if "\n" in line:
+                for piece in line.split("\n"):
+                    yield from self.apply_line(piece, index + 1)
+                return
+        yield line
+
+
+def load_rules(rules_file=RULES_FILE):
+    # Rule lists by name: DEFAULT_RULES updated from rules_file, or the
+    # defaults alone when that file cannot be read or compiled.
+    if os.path.exists(rules_file):
+        try:
+            rules = dict(DEFAULT_RULES)
+            with open(rules_file, "r", encoding="utf-8") as f:
+                rules.update(json.load(f))
+            for rule_list in rules.values():
+                compile_rules(rule_list)
+            return rules
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, re.error) as e:
+            print(f"Error reading {rules_file}, using default rules: {e}")
+    return dict(DEFAULT_RULES)
+
+
+def load_rule_sets(rules_file=RULES_FILE):
+    return {name: RuleSet(rule_list) for name, rule_list in load_rules(rules_file).items()}
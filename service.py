@@ -0,0 +1,316 @@
+import io
+import os
+import json
+import base64
+import argparse
+import tempfile
+import threading
+import multiprocessing
+import urllib.request
+import urllib.error
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from docx import Document
+from test17 import build_schedule_document, extract_kw_numbers
+from pipeline import load_week
+from pdf_cache import PdfTextCache, DEFAULT_CACHE_DIR
+from pdf_report import report_from_document, render_report_pdf
+from identity import resolve_user_name
+from docx_reader import apply_themes_to_document
+
+# Headless report service. The HTTP server takes requests on threads and
+# hands the work to a pool of worker processes that keep the pipeline
+# imported between requests. Only max_workers + queue_size requests are
+# accepted at a time; everything beyond that is turned away with 503 so
+# callers back off instead of piling up.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 20 * 1024 * 1024
+REPORT_PREFIX = "Weekly_Class_Schedules"
+CONTENT_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+_cache = None
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+def warm_up(cache_dir=None):
+    # Runs once in every worker process; loading the default template here
+    # keeps it out of the first request.
+    global _cache
+    _cache = PdfTextCache(cache_dir) if cache_dir else None
+    Document()
+
+
+def render_report(pdf_data, include_signature=True, themes=None, full_name=None, output_format="docx"):
+    fd, pdf_file = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_data)
+        schedule_text, days = load_week(pdf_file, cache=_cache)
+    finally:
+        os.remove(pdf_file)
+
+    doc = build_schedule_document(schedule_text, include_signature=include_signature, days=days,
+                                  full_name=full_name)
+    if themes:
+        apply_themes_to_document(doc, themes)
+
+    kw_numbers = extract_kw_numbers(schedule_text)
+    filename = f"{REPORT_PREFIX}_{'_'.join(kw_numbers) if kw_numbers else 'KW_Unknown'}.{output_format}"
+    if output_format == "pdf":
+        header, day_rows = report_from_document(doc)
+        fd, output_file = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            render_report_pdf(output_file, header, day_rows, include_signature)
+            with open(output_file, "rb") as f:
+                return filename, f.read()
+        finally:
+            os.remove(output_file)
+
+    output = io.BytesIO()
+    doc.save(output)
+    return filename, output.getvalue()
+
+
+class ReportService:
+    def __init__(self, max_workers=2, queue_size=4, cache_dir=DEFAULT_CACHE_DIR, full_name=None, timeout=120):
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.full_name = full_name
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self.active = 0
+        self.lock = threading.Lock()
+        self.executor = self.new_executor()
+
+    def new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=warm_up, initargs=(self.cache_dir,))
+
+    def replace_executor(self, broken):
+        # A worker that dies (out of memory, crash) breaks the whole pool
+        # for good, so the next request gets a new one. Returns the pool to
+        # use from now on.
+        with self.lock:
+            if self.executor is broken:
+                print("Worker process died, starting new workers.")
+                self.executor = self.new_executor()
+                broken.shutdown(wait=False)
+            return self.executor
+
+    def submit(self, *args):
+        executor = self.executor
+        try:
+            return executor, executor.submit(*args)
+        except BrokenProcessPool:
+            executor = self.replace_executor(executor)
+            return executor, executor.submit(*args)
+
+    def render(self, pdf_data, include_signature=True, themes=None, full_name=None, output_format="docx"):
+        if not self.slots.acquire(blocking=False):
+            raise ServiceBusy()
+        with self.lock:
+            self.active += 1
+        try:
+            executor, future = self.submit(render_report, pdf_data, include_signature, themes,
+                                           full_name or self.full_name, output_format)
+        except BaseException:
+            self.job_finished()
+            raise
+        # The slot is held until the worker is done, even if the request
+        # timed out, so a stuck report still counts against the limit.
+        future.add_done_callback(lambda _: self.job_finished())
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            self.replace_executor(executor)
+            raise
+
+    def job_finished(self):
+        with self.lock:
+            self.active -= 1
+        self.slots.release()
+
+    def status(self):
+        return {"status": "ok", "workers": self.max_workers, "active": self.active}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def parse_report_request(body):
+    # {"pdf": base64, "signature": bool, "themes": {old: new}, "name": str, "format": "docx" | "pdf"}
+    try:
+        request = json.loads(body)
+        pdf_data = base64.b64decode(request["pdf"], validate=True)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid request: {e}")
+    themes = request.get("themes") or {}
+    output_format = request.get("format", "docx")
+    if output_format not in CONTENT_TYPES:
+        raise ValueError(f"Unknown format: {output_format}")
+    if not isinstance(themes, dict):
+        raise ValueError("themes must be an object mapping old to new themes")
+    include_signature = request.get("signature", True)
+    if not isinstance(include_signature, bool):
+        raise ValueError("signature must be true or false")
+    return {
+        "pdf_data": pdf_data,
+        "include_signature": include_signature,
+        "themes": themes,
+        "full_name": request.get("name"),
+        "output_format": output_format,
+    }
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": "Not found"})
+            return
+        self.send_json(200, self.server.service.status())
+
+    def do_POST(self):
+        if self.path != "/report":
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_json(400, {"error": "Invalid Content-Length"})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {"error": "Request too large"})
+            return
+        try:
+            job = parse_report_request(self.rfile.read(length))
+            filename, data = self.server.service.render(**job)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except ServiceBusy:
+            self.send_json(503, {"error": "Too many requests, try again later"}, {"Retry-After": "1"})
+            return
+        except TimeoutError:
+            self.send_json(504, {"error": "Report took too long"})
+            return
+        except Exception as e:
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[job["output_format"]])
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ReportRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def request_report(pdf_file, output_file=None, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", include_signature=True,
+                   themes=None, name=None, output_format="docx", timeout=180):
+    # Client for the service; writes the report next to the PDF unless
+    # output_file is given and returns its path.
+    with open(pdf_file, "rb") as f:
+        payload = {
+            "pdf": base64.b64encode(f.read()).decode("ascii"),
+            "signature": include_signature,
+            "themes": themes or {},
+            "name": name,
+            "format": output_format,
+        }
+    request = urllib.request.Request(url.rstrip("/") + "/report", data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            disposition = response.headers.get("Content-Disposition", "")
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise RuntimeError(f"Report service returned {e.code}: {message}")
+
+    if output_file is None:
+        filename = disposition.split('filename="', 1)[1].rstrip('"') if 'filename="' in disposition else \
+            f"{REPORT_PREFIX}.{output_format}"
+        output_file = os.path.join(os.path.dirname(os.path.abspath(pdf_file)), filename)
+    with open(output_file, "wb") as f:
+        f.write(data)
+    return output_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve weekly reports over HTTP, or request one from the service.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the report service")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("-w", "--workers", type=int, default=2, help="worker processes")
+    serve.add_argument("--queue", type=int, default=4, help="requests allowed to wait for a worker")
+    serve.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="PDF text cache shared by the workers")
+    serve.add_argument("--no-cache", action="store_true", help="always extract the PDF text again")
+    serve.add_argument("--name", default=None, help="trainee name used when a request has none")
+
+    report = commands.add_parser("report", help="send a timetable PDF to a running service")
+    report.add_argument("pdf_file")
+    report.add_argument("-o", "--output", default=None)
+    report.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    report.add_argument("--pdf", action="store_true", help="ask for a PDF instead of a DOCX")
+    report.add_argument("--no-signature", action="store_true")
+    report.add_argument("--themes", default=None, help="JSON file with a theme mapping to apply")
+    report.add_argument("--name", default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.command == "serve":
+        service = ReportService(args.workers, args.queue, None if args.no_cache else args.cache_dir,
+                                full_name=resolve_user_name(args.name, use_word=False))
+        server = create_server(service, args.host, args.port)
+        print(f"Serving reports on http://{args.host}:{args.port} with {args.workers} workers")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.close()
+    else:
+        themes = None
+        if args.themes:
+            with open(args.themes, "r", encoding="utf-8") as f:
+                themes = json.load(f)
+        output_file = request_report(args.pdf_file, args.output, args.url, not args.no_signature, themes, args.name,
+                                     "pdf" if args.pdf else "docx")
+        print(f"Saved {output_file}")
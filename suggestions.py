@@ -0,0 +1,116 @@
+import bisect
+import heapq
+from collections import Counter
+
+# Suggests themes from earlier renames. A theme in the schedule table reads
+# "subject / instructor" and a rename only replaces the subject, so the
+# index learns which subject replaced which one, looked up from the most
+# to the least specific key. The Praxisunterricht slot gets a random
+# subject each week, so for it the instructor and weekday carry the most
+# information.
+
+MIN_NGRAM = 3
+
+
+def split_theme(theme):
+    if ' / ' in theme:
+        subject, instructor = theme.split(' / ', 1)
+        return subject.strip(), instructor.strip()
+    return theme.strip(), ""
+
+
+def join_theme(subject, instructor):
+    return f"{subject} / {instructor}" if instructor else subject
+
+
+def lookup_keys(subject, instructor, weekday):
+    keys = []
+    if weekday:
+        keys.append(("sid", subject, instructor, weekday))
+    keys.append(("si", subject, instructor))
+    if weekday and instructor:
+        keys.append(("id", instructor, weekday))
+    keys.append(("s", subject))
+    return keys
+
+
+def ngrams(text, n=MIN_NGRAM):
+    text = text.lower()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SuggestionIndex:
+    def __init__(self):
+        self.renames = {}
+        self.subjects = Counter()
+        self.sorted_subjects = None
+        self.ngram_index = None
+
+    def add(self, theme, new_theme, weekday=None, count=1):
+        subject, instructor = split_theme(theme)
+        new_subject = split_theme(new_theme)[0]
+        if not new_subject or new_subject == subject:
+            return
+        for key in lookup_keys(subject, instructor, weekday):
+            self.renames.setdefault(key, Counter())[new_subject] += count
+        self.subjects[new_subject] += count
+        self.sorted_subjects = None
+        self.ngram_index = None
+
+    def suggest_subject(self, theme, weekday=None):
+        subject, instructor = split_theme(theme)
+        for key in lookup_keys(subject, instructor, weekday):
+            counts = self.renames.get(key)
+            if counts:
+                return counts.most_common(1)[0][0]
+        return None
+
+    def suggest(self, theme, weekday=None):
+        new_subject = self.suggest_subject(theme, weekday)
+        if new_subject is None:
+            return None
+        return join_theme(new_subject, split_theme(theme)[1])
+
+    def build_lookup(self):
+        self.sorted_subjects = sorted((subject.lower(), subject) for subject in self.subjects)
+        self.ngram_index = {}
+        for subject in self.subjects:
+            for gram in ngrams(subject):
+                self.ngram_index.setdefault(gram, set()).add(subject)
+
+    def complete(self, text, limit=5):
+        # Subjects starting with text first, then subjects containing it,
+        # each ordered by how often they were used.
+        text = text.strip()
+        if not text:
+            return []
+        if self.sorted_subjects is None:
+            self.build_lookup()
+
+        query = text.lower()
+        start = bisect.bisect_left(self.sorted_subjects, (query,))
+        stop = bisect.bisect_left(self.sorted_subjects, (query + "\U0010ffff",))
+        matches = heapq.nlargest(limit, (subject for _, subject in self.sorted_subjects[start:stop]),
+                                 key=self.subjects.__getitem__)
+        if len(matches) < limit and len(query) >= MIN_NGRAM:
+            candidates = None
+            for gram in ngrams(query):
+                found = self.ngram_index.get(gram, set())
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    break
+            seen = set(matches)
+            matches += heapq.nlargest(limit - len(matches), (subject for subject in candidates or ()
+                                                             if subject not in seen and query in subject.lower()),
+                                      key=self.subjects.__getitem__)
+        return matches[:limit]
+
+
+def build_suggestion_index(store):
+    index = SuggestionIndex()
+    for weekday, theme, new_theme, count in store.usage():
+        index.add(theme, new_theme, weekday, count)
+    # Mappings saved without a weekday still count for the broader keys.
+    for theme, new_theme in store.load().items():
+        index.add(theme, new_theme)
+    return index
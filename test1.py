@@ -1,31 +1,195 @@
-import re
-import PyPDF2
-from tkinter import filedialog, Tk
-
-def select_pdf_file():
-    root = Tk()
-    root.withdraw()
-    return filedialog.askopenfilename(title="Select PDF file", filetypes=[("PDF Files", "*.pdf")])
-
-def extract_text_from_pdf(pdf_file):
-    full_text = ""
-    with open(pdf_file, "rb") as file:
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                full_text += page_text + "\n"
-    return full_text
-
-def main():
-    pdf_file = select_pdf_file()
-    if not pdf_file:
-        print("No PDF file selected. Exiting...")
-        return
-
-    text_content = extract_text_from_pdf(pdf_file)
-    with open("schedule.txt", "w", encoding="utf-8") as txt_file:
-        txt_file.write(text_content)
-
-if __name__ == "__main__":
-    main()
+import os
+import re
+import PyPDF2
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import filedialog, Tk
+from test2 import extract_dates, convert_to_date
+from profiling import profiler
+
+# Bump the suffix whenever the page text produced here changes, so stale
+# cache entries are no longer hit.
+EXTRACTOR_VERSION = f"PyPDF2-{PyPDF2.__version__}-1"
+
+def select_pdf_file(parent=None):
+    if parent is None:
+        parent = Tk()
+        parent.withdraw()
+    return filedialog.askopenfilename(parent=parent, title="Select PDF file", filetypes=[("PDF Files", "*.pdf")])
+
+def count_pdf_pages(pdf_file):
+    with open(pdf_file, "rb") as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def extract_page_range(pdf_file, start, stop):
+    with open(pdf_file, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        stop = page_count if stop is None else min(stop, page_count)
+        return page_count, [reader.pages[i].extract_text() for i in range(start, stop)]
+
+def split_page_range(start, stop, parts):
+    if stop <= start:
+        return []
+    size, extra = divmod(stop - start, parts)
+    ranges = []
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
+
+def extract_pages(pdf_file, start, last_page=None, max_workers=1):
+    if not max_workers or max_workers <= 1:
+        return extract_page_range(pdf_file, start, last_page)
+
+    page_count = count_pdf_pages(pdf_file)
+    stop = page_count if last_page is None else min(last_page, page_count)
+
+    # Every worker opens the file itself and takes one contiguous range,
+    # so only page text crosses the process boundary.
+    ranges = split_page_range(start, stop, max_workers)
+    with ProcessPoolExecutor(max_workers=max(len(ranges), 1)) as executor:
+        chunks = executor.map(extract_page_range, [pdf_file] * len(ranges),
+                              [r[0] for r in ranges], [r[1] for r in ranges])
+        return page_count, [text for _, chunk in chunks for text in chunk]
+
+def extract_text_from_pdf(pdf_file, first_page=0, last_page=None, max_workers=1, cache=None):
+    with profiler.stage('test1 extract pdf', pdf=os.path.basename(pdf_file)) as record:
+        start = max(first_page, 0)
+        key = cache.key_for(pdf_file, EXTRACTOR_VERSION) if cache else None
+        cached = cache.load(key) if cache else None
+
+        page_texts = None
+        if cached:
+            page_count, pages = cached
+            stop = page_count if last_page is None else min(last_page, page_count)
+            if all(i in pages for i in range(start, stop)):
+                page_texts = [pages[i] for i in range(start, stop)]
+        record['cache_hit'] = page_texts is not None
+
+        if page_texts is None:
+            page_count, page_texts = extract_pages(pdf_file, start, last_page, max_workers)
+            if cache:
+                pages = cached[1] if cached else {}
+                pages.update(zip(range(start, start + len(page_texts)), page_texts))
+                cache.store(key, page_count, pages)
+
+        text = join_pages(page_texts)
+        record['pages'] = len(page_texts)
+        if profiler.enabled:
+            record['bytes_out'] = len(text.encode("utf-8"))
+        return text
+
+def join_pages(page_texts):
+    return "".join(page_text + "\n" for page_text in page_texts if page_text)
+
+def load_cached_pages(pdf_file, cache):
+    # (page_count, {page: text}) from the cache, or None.
+    return cache.load(cache.key_for(pdf_file, EXTRACTOR_VERSION)) if cache else None
+
+def text_dates(text):
+    dates = []
+    for date in extract_dates(text):
+        try:
+            dates.append(convert_to_date(date))
+        except ValueError:
+            pass
+    return dates
+
+def probe_page_dates(page):
+    # Dates written as plain strings in the page's content stream. Much
+    # cheaper than extract_text, but misses text the PDF encodes otherwise.
+    contents = page.get("/Contents")
+    if contents is None:
+        return []
+    contents = contents.get_object()
+    streams = contents if isinstance(contents, list) else [contents]
+    data = b"".join(stream.get_object().get_data() for stream in streams)
+    return text_dates(data.decode("latin-1"))
+
+def newest_week_first_page(pdf_file, cached=None):
+    # First page showing the newest date, and that date; (None, None) when
+    # the probe finds no dates at all. The newest week comes last, so pages
+    # are probed from the end until a page of an older week shows up.
+    # Pages in cached (load_cached_pages) are read from their text, the PDF
+    # is only opened for the others.
+    pages = cached[1] if cached else {}
+    first_page, newest_date = None, None
+    with open(pdf_file, "rb") as file:
+        reader = None if cached else PyPDF2.PdfReader(file)
+        page_count = cached[0] if cached else len(reader.pages)
+        for i in range(page_count - 1, -1, -1):
+            if i in pages:
+                dates = text_dates(pages[i])
+            else:
+                reader = reader or PyPDF2.PdfReader(file)
+                dates = probe_page_dates(reader.pages[i])
+            if not dates:
+                continue
+            if newest_date is None:
+                newest_date = max(dates)
+                week_start = newest_date - timedelta(days=newest_date.weekday())
+            if newest_date in dates:
+                first_page = i
+            elif max(dates) < week_start:
+                break
+    return first_page, newest_date
+
+def read_newest_week(pdf_file, read_pages, cached=None):
+    # read_pages(first_page) returns (text, result) for the pages from
+    # first_page on; the result for the pages from the newest week on is
+    # returned, which is all test2.remove_lines_before_newest_date keeps.
+    # The page before is added when the class header is not on the first
+    # page, and the whole document is read when the probe finds nothing or
+    # the text does not confirm its newest date. cached is the text cache
+    # entry, if any, for the probe.
+    with profiler.stage('test1 probe dates', pdf=os.path.basename(pdf_file)) as record:
+        first_page, newest_date = newest_week_first_page(pdf_file, cached)
+        record['first_page'] = first_page
+    if first_page is None:
+        return read_pages(0)[1]
+
+    newest_date_str = newest_date.strftime("%d.%m.%Y")
+    text, result = read_pages(first_page)
+    if first_page > 0 and "Klasse:" not in text.split(newest_date_str, 1)[0]:
+        text, result = read_pages(first_page - 1)
+    dates = [convert_to_date(date) for date in extract_dates(text)]
+    if not dates or max(dates) != newest_date:
+        print("Page probe did not match the extracted text, reading all pages.")
+        return read_pages(0)[1]
+    return result
+
+def extract_newest_week_text(pdf_file, max_workers=1, cache=None):
+    # The cache entry is loaded once, for the probe and for the text.
+    cached = load_cached_pages(pdf_file, cache)
+
+    def read_pages(first_page):
+        if cached and all(i in cached[1] for i in range(first_page, cached[0])):
+            with profiler.stage('test1 extract pdf', pdf=os.path.basename(pdf_file), cache_hit=True) as record:
+                text = join_pages(cached[1][i] for i in range(first_page, cached[0]))
+                record['pages'] = cached[0] - first_page
+        else:
+            text = extract_text_from_pdf(pdf_file, first_page, max_workers=max_workers, cache=cache)
+        return text, text
+    return read_newest_week(pdf_file, read_pages, cached)
+
+def main(max_workers=1, cache=None):
+    pdf_file = select_pdf_file()
+    if not pdf_file:
+        print("No PDF file selected. Exiting...")
+        return
+
+    write_schedule_text(pdf_file, max_workers=max_workers, cache=cache)
+
+def write_schedule_text(pdf_file, output_file="schedule.txt", max_workers=1, cache=None, newest_week_only=False):
+    if newest_week_only:
+        text_content = extract_newest_week_text(pdf_file, max_workers=max_workers, cache=cache)
+    else:
+        text_content = extract_text_from_pdf(pdf_file, max_workers=max_workers, cache=cache)
+    with open(output_file, "w", encoding="utf-8") as txt_file:
+        txt_file.write(text_content)
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,44 @@
-import re
-
-def merge_teacher_names(file_input, file_output):
-    with open(file_input, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-
-    merged_lines = []
-    i = 0
-    while i < len(lines):
-        current_line = lines[i].strip()
-        next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
-
-        if '/' in current_line and not re.match(r'\d{2}:\d{2}-\d{2}:\d{2}', next_line):
-            merged_lines.append(current_line + " " + next_line)
-            i += 2
-        else:
-            merged_lines.append(current_line)
-            i += 1
-
-    with open(file_output, 'w', encoding='utf-8') as file:
-        file.write("\n".join(merged_lines))
+import re
+
+TIME_RANGE_PATTERN = re.compile(r'\d{2}:\d{2}-\d{2}:\d{2}')
+
+def merge_teacher_names(file_input, file_output):
+    with open(file_input, 'r', encoding='utf-8') as file:
+        lines = file.readlines()
+
+    merged_lines = []
+    i = 0
+    while i < len(lines):
+        current_line = lines[i].strip()
+        next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
+
+        if '/' in current_line and not TIME_RANGE_PATTERN.match(next_line):
+            merged_lines.append(current_line + " " + next_line)
+            i += 2
+        else:
+            merged_lines.append(current_line)
+            i += 1
+
+    with open(file_output, 'w', encoding='utf-8') as file:
+        file.write("\n".join(merged_lines))
+
+
+def iter_merge_teacher_names(lines):
+    pending = None
+    for line in lines:
+        line = line.strip()
+        if pending is not None:
+            if not TIME_RANGE_PATTERN.match(line):
+                yield pending + " " + line
+                pending = None
+                continue
+            yield pending
+            pending = None
+
+        if '/' in line:
+            pending = line
+        else:
+            yield line
+
+    if pending is not None:
+        yield pending + " "
@@ -1,244 +1,576 @@
-import tkinter as tk
-from tkinter import messagebox
-import threading
-import json
-import os
-import shutil
-import comtypes.client
-from docx import Document
-from test17 import extract_kw_numbers
-THEME_FILE = "updated_themes.json"
-SCHEDULE_DOC = "Weekly_Class_Schedules.docx"
-
-def read_schedule_from_file(file_path):
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return file.read()
-
-def load_themes():
-    if os.path.exists(THEME_FILE):
-        with open(THEME_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_themes(themes):
-    with open(THEME_FILE, "w", encoding="utf-8") as f:
-        json.dump(themes, f, indent=4, ensure_ascii=False)
-
-def extract_class_info_from_docx(doc_path):
-    if not os.path.exists(doc_path):
-        return [], "Document not found. Please generate or provide the document."
-    doc = Document(doc_path)
-    class_info = []
-    weekday_map = {"Montag": "Montag", "Dienstag": "Dienstag", "Mittwoch": "Mittwoch", "Donnerstag": "Donnerstag", "Freitag": "Freitag"}
-    current_day = None
-    for table in doc.tables:
-        for row in table.rows:
-            cells = row.cells
-            if len(cells) >= 7:
-                day_text = cells[0].text.strip()
-                if day_text in weekday_map:
-                    current_day = weekday_map[day_text]
-                    continue
-                if current_day:
-                    theme = cells[1].text.strip()
-                    instructor = cells[4].text.strip() if len(cells) > 4 else "Unknown"
-                    if theme and instructor:
-                        class_info.append((current_day, theme, instructor))
-    if not class_info:
-        return [], "No class information found in the document."
-    return class_info, "Class information successfully extracted from the document."
-
-def update_themes_in_docx(doc_path, updated_themes):
-    doc = Document(doc_path)
-    for table in doc.tables:
-        for row in table.rows:
-            cells = row.cells
-            if len(cells) >= 7:
-                theme = cells[1].text.strip()
-                if theme in updated_themes:
-                    cells[1].text = updated_themes[theme]
-    doc.save(doc_path)
-
-class ThemeEditorApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("ClassEditor")
-        self.root.geometry("600x400")
-        self.updated_themes = load_themes()
-        self.class_info = []
-        self.create_widgets()
-        self.load_class_info()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
-
-    def on_close(self):
-        cleanup_thread = threading.Thread(target=self.cleanup_files)
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
-        cleanup_thread.join()
-        self.root.quit()
-        self.root.destroy()
-
-    def cleanup_files(self):
-        try:
-            if os.path.exists("schedule.txt"):
-                os.remove("schedule.txt")
-            if os.path.exists("days"):
-                if os.path.isdir("days"):
-                    shutil.rmtree("days")
-                else:
-                    os.remove("days")
-        except Exception as e:
-            print(f"Error during cleanup: {e}")
-
-    def create_widgets(self):
-        self.class_info_label = tk.Label(self.root, text="Available Class Information:")
-        self.class_info_label.pack(pady=5)
-
-        self.class_info_listbox = tk.Listbox(self.root, width=70, height=10)
-        self.class_info_listbox.pack(pady=5)
-
-        self.rename_label = tk.Label(self.root, text="Edit Selected Class:")
-        self.rename_label.pack(pady=5)
-
-        self.rename_entry = tk.Entry(self.root, width=50)
-        self.rename_entry.pack(pady=5)
-
-        self.rename_button = tk.Button(self.root, text="Update Selected Classes", command=self.rename_class)
-        self.rename_button.pack(pady=5)
-
-        self.update_all_button = tk.Button(self.root, text="Update All Classes", command=self.update_all_themes)
-        self.update_all_button.pack(pady=5)
-
-        button_frame = tk.Frame(self.root)
-        button_frame.pack(pady=5)
-
-        self.save_button = tk.Button(button_frame, text="Save PDF Document", command=self.save_updated_document)
-        self.save_button.pack(side=tk.LEFT, padx=5)
-
-        self.signature_checkbox = tk.Checkbutton(button_frame, text="Digital(No Signature)", command=self.toggle_signature)
-        self.signature_checkbox.pack(side=tk.LEFT)
-
-        self.status_label = tk.Label(self.root, text="", fg="green")
-        self.status_label.pack(pady=5)
-
-        self.include_signature = True
-
-
-
-    def load_class_info(self):
-        class_info, message = extract_class_info_from_docx(SCHEDULE_DOC)
-        if class_info:
-            self.class_info = class_info
-            self.class_info_listbox.delete(0, tk.END)
-            for day, theme, instructor in class_info:
-                self.class_info_listbox.insert(tk.END, f"{day}: {theme}")
-        else:
-            messagebox.showerror("Error", message)
-
-    def rename_class(self):
-        selected = self.class_info_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("Warning", "Please select a class to rename.")
-            return
-        
-        selected_index = selected[0]
-        day, old_theme, instructor = self.class_info[selected_index]
-
-        if ' / ' in old_theme:
-            theme_prefix = old_theme.split(' / ')[0]
-            theme_suffix = old_theme.split(' / ')[1]
-        else:
-            theme_prefix = old_theme
-            theme_suffix = ""
-
-        new_theme_prefix = self.rename_entry.get().strip()
-
-        if new_theme_prefix and new_theme_prefix != theme_prefix:
-            new_theme = f"{new_theme_prefix} / {theme_suffix}" if theme_suffix else new_theme_prefix
-
-            self.updated_themes[old_theme] = new_theme
-
-            for i, (current_day, current_theme, current_instructor) in enumerate(self.class_info):
-                if current_theme.startswith(theme_prefix):
-                    if ' / ' in current_theme:
-                        new_theme_for_instructor = f"{new_theme_prefix} / {current_theme.split(' / ')[1]}"
-                        self.updated_themes[current_theme] = new_theme_for_instructor
-                    else:
-                        self.updated_themes[current_theme] = new_theme_prefix
-                    # Update the class_info list
-                    self.class_info[i] = (current_day, self.updated_themes[current_theme], current_instructor)
-
-            save_themes(self.updated_themes)
-
-            self.class_info[selected_index] = (day, new_theme, instructor)
-
-            self.refresh_class_info_list()
-            self.status_label.config(text=f"Theme '{old_theme}' renamed to '{new_theme}'.", fg="green")
-
-            update_themes_in_docx(SCHEDULE_DOC, self.updated_themes)
-
-        
-    def refresh_class_info_list(self):
-        self.class_info_listbox.delete(0, tk.END)
-        for day, theme, instructor in self.class_info:
-            self.class_info_listbox.insert(tk.END, f"{day}: {theme}")
-
-    def update_all_themes(self):
-        all_updated_themes = []
-        for day, theme, instructor in self.class_info:
-            updated_theme = self.updated_themes.get(theme, theme)
-            all_updated_themes.append((day, updated_theme, instructor))
-        
-        self.class_info_listbox.delete(0, tk.END)
-        for day, updated_theme, instructor in all_updated_themes:
-            self.class_info_listbox.insert(tk.END, f"{day}: {updated_theme}")
-        
-        save_themes(self.updated_themes)
-        self.status_label.config(text="All themes have been updated.", fg="green")
-
-        update_themes_in_docx(SCHEDULE_DOC, self.updated_themes)
-    
-    def toggle_signature(self):
-        self.include_signature = not self.include_signature
-        status = "included" if self.include_signature else "removed"
-        self.status_label.config(text=f"Signature section will be {status}.", fg="green")
-
-    def save_updated_document(self):
-        self.updated_themes = load_themes()
-        valid_themes = {theme: new_theme for theme, new_theme in self.updated_themes.items() if new_theme != "Praxisunterricht"}
-        if not valid_themes:
-            messagebox.showwarning("Warning", "No valid themes to save.")
-            return
-        message = update_themes_in_docx(SCHEDULE_DOC, valid_themes)
-        
-        self.save_as_pdf(SCHEDULE_DOC, self.include_signature)
-        save_themes(valid_themes)
-
-
-    def save_as_pdf(self, doc_path, include_signature):
-        try:
-            word = comtypes.client.CreateObject('Word.Application')
-            word.Visible = False
-            doc = word.Documents.Open(os.path.abspath(doc_path))
-            schedule_text = read_schedule_from_file('schedule.txt')
-            kw_numbers = extract_kw_numbers(schedule_text)
-            kw_label = "_".join(kw_numbers) if kw_numbers else "KW_Unknown"
-            pdf_path = os.path.splitext(doc_path)[0] + f"_{kw_label}.pdf"
-            
-            if not include_signature:
-                if doc.Paragraphs.Count > 1:
-                    doc.Paragraphs(doc.Paragraphs.Count).Range.Delete()
-            
-            doc.SaveAs(os.path.abspath(pdf_path), FileFormat=17)
-            doc.Close()
-            word.Quit()
-            self.status_label.config(text=f"Document saved as PDF: {pdf_path}", fg="green")
-        except Exception as e:
-            self.status_label.config(text=f"Failed to save as PDF: {e}", fg="red")
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = ThemeEditorApp(root)
-    root.mainloop()
+import tkinter as tk
+from tkinter import messagebox
+import threading
+import queue
+import bisect
+import os
+import shutil
+from docx import Document
+from docx_reader import (iter_class_info, iter_class_info_from_docx, iter_document_rows, index_theme_cells,
+                         apply_themes_to_document, apply_themes_to_cells)
+from theme_store import ThemeStore
+from suggestions import build_suggestion_index, split_theme
+from test17 import extract_kw_numbers, extract_dates_and_class
+from profiling import profiler
+from pdf_report import pdf_output_path, report_from_docx, report_from_document, render_report_pdf
+from week_archive import archive_week
+SCHEDULE_DOC = "Weekly_Class_Schedules.docx"
+CLOSE_TIMEOUT = 10
+
+def read_schedule_from_file(file_path):
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+_theme_store = None
+
+def get_theme_store():
+    global _theme_store
+    if _theme_store is None:
+        _theme_store = ThemeStore()
+    return _theme_store
+
+def load_themes():
+    return get_theme_store().load()
+
+def save_themes(themes, week=None):
+    get_theme_store().sync(themes, week)
+
+def current_week(schedule_file='schedule.txt'):
+    # "2024-KW12", the key theme changes are recorded under in the store.
+    try:
+        schedule_text = read_schedule_from_file(schedule_file)
+    except OSError:
+        return None
+    kw = "_".join(extract_kw_numbers(schedule_text))
+    if not kw:
+        return None
+    newest_date = extract_dates_and_class(schedule_text)[2]
+    return f"{newest_date.year}-KW{kw}" if newest_date else kw
+
+def extract_class_info_from_docx(doc_path):
+    if not os.path.exists(doc_path):
+        return [], "Document not found. Please generate or provide the document."
+    return class_info_result(list(iter_class_info_from_docx(doc_path)))
+
+def extract_class_info_from_document(doc, cell_index=None):
+    if cell_index is not None:
+        cell_index.update(index_theme_cells(doc))
+    return class_info_result(list(iter_class_info(iter_document_rows(doc))))
+
+def class_info_result(class_info):
+    if not class_info:
+        return [], "No class information found in the document."
+    return class_info, "Class information successfully extracted from the document."
+
+class ThemeIndex:
+    # Rows of class_info by theme, with the themes kept sorted so every
+    # theme starting with a prefix is found with two bisections.
+    def __init__(self, class_info):
+        self.rows = {}
+        for i, (_, theme, _) in enumerate(class_info):
+            self.rows.setdefault(theme, []).append(i)
+        self.themes = sorted(self.rows)
+
+    def add(self, theme, row):
+        if theme not in self.rows:
+            self.rows[theme] = []
+            bisect.insort(self.themes, theme)
+        self.rows[theme].append(row)
+
+    def remove(self, theme, row):
+        rows = self.rows.get(theme)
+        if rows is None:
+            return
+        rows.remove(row)
+        if not rows:
+            del self.rows[theme]
+            del self.themes[bisect.bisect_left(self.themes, theme)]
+
+    def move(self, row, old_theme, new_theme):
+        if old_theme != new_theme:
+            self.remove(old_theme, row)
+            self.add(new_theme, row)
+
+    def rows_with_prefix(self, prefix):
+        start = bisect.bisect_left(self.themes, prefix)
+        stop = bisect.bisect_left(self.themes, prefix + "\U0010ffff")
+        return sorted(row for theme in self.themes[start:stop] for row in self.rows[theme])
+
+def update_themes_in_docx(doc_path, updated_themes):
+    doc = Document(doc_path)
+    apply_themes_to_document(doc, updated_themes)
+    doc.save(doc_path)
+
+def drain_queue(items):
+    drained = []
+    while True:
+        try:
+            drained.append(items.get_nowait())
+        except queue.Empty:
+            return drained
+
+class BackgroundDocumentWriter:
+    # Keeps the edited document and theme mapping in memory and writes them
+    # from a worker thread once no edit has arrived for idle_delay seconds.
+    # Theme mappings arrive through the updates queue and are applied to the
+    # cells on that thread too, so the Tk thread never waits for a save.
+    # Other threads hold self.lock while they read the document.
+    def __init__(self, doc, doc_path, cell_index=None, updates=None, idle_delay=1.0, week=None):
+        self.doc = doc
+        self.doc_path = doc_path
+        self.cell_index = index_theme_cells(doc) if cell_index is None else cell_index
+        self.updates = queue.Queue() if updates is None else updates
+        self.week = week
+        self.idle_delay = idle_delay
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.pending_themes = None
+        self.stopped = False
+        self.changed = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def apply_themes(self, themes):
+        self.updates.put(dict(themes))
+        self.changed.set()
+
+    def run(self):
+        while True:
+            self.changed.wait()
+            while not self.stopped:
+                self.changed.clear()
+                if not self.changed.wait(self.idle_delay):
+                    break
+            if self.stopped:
+                return
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            try:
+                for themes in drain_queue(self.updates):
+                    apply_themes_to_cells(self.cell_index, themes)
+                    self.dirty = True
+                    self.pending_themes = themes
+                if self.dirty:
+                    profiler.call('gui save document', self.doc.save, self.doc_path)
+                    self.dirty = False
+                if self.pending_themes is not None:
+                    save_themes(self.pending_themes, self.week)
+                    self.pending_themes = None
+            except Exception as e:
+                print(f"Error while saving changes: {e}")
+
+    def close(self):
+        self.stopped = True
+        self.changed.set()
+        self.thread.join()
+        self.flush()
+
+class TaskCancelled(Exception):
+    pass
+
+class BackgroundTask:
+    # Runs func(report, cancel_event) on a worker thread. Progress messages
+    # passed to report() and the final result come back through a queue
+    # that the Tk thread polls with root.after, so widgets are only touched
+    # from mainloop. Cancelling is cooperative: func checks cancel_event
+    # between its steps and raises TaskCancelled.
+    def __init__(self, root, func, on_progress=None, on_done=None, on_error=None, on_cancelled=None, poll_ms=100):
+        self.root = root
+        self.func = func
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.poll_ms = poll_ms
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.finished = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.root.after(self.poll_ms, self.poll)
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def join(self, timeout=None):
+        # True once the worker has stopped.
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def report(self, message):
+        self.messages.put(("progress", message))
+
+    def run(self):
+        try:
+            result = self.func(self.report, self.cancel_event)
+        except TaskCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", e))
+        else:
+            self.messages.put(("done", result))
+
+    def poll(self):
+        try:
+            while True:
+                kind, value = self.messages.get_nowait()
+                callback = {"progress": self.on_progress, "done": self.on_done,
+                            "error": self.on_error, "cancelled": self.on_cancelled}[kind]
+                if kind != "progress":
+                    self.finished = True
+                if callback:
+                    callback(value)
+        except queue.Empty:
+            pass
+        if not self.finished:
+            self.root.after(self.poll_ms, self.poll)
+
+class ThemeEditorApp:
+    def __init__(self, root, load=True):
+        self.root = root
+        self.root.title("ClassEditor")
+        self.root.geometry("600x400")
+        self.updated_themes = load_themes()
+        self.week = None
+        self.class_info = []
+        self.original_class_info = []
+        self.suggestions = build_suggestion_index(get_theme_store())
+        self.document = None
+        self.writer = None
+        self.theme_index = ThemeIndex([])
+        self.cell_index = {}
+        self.document_loader = None
+        self.theme_updates = queue.Queue()
+        self.task = None
+        self.create_widgets()
+        if load:
+            self.load_class_info()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        # The worker only stops between stages, so it is waited for before
+        # its files are deleted and the theme store is closed.
+        task_stopped = True
+        if self.task:
+            self.task.cancel()
+            task_stopped = self.task.join(CLOSE_TIMEOUT)
+        self.wait_for_document()
+        if self.writer:
+            self.writer.close()
+        if not task_stopped:
+            print("Background task did not stop in time, leaving its files in place.")
+            self.root.quit()
+            self.root.destroy()
+            return
+        get_theme_store().close()
+        cleanup_thread = threading.Thread(target=self.cleanup_files)
+        cleanup_thread.daemon = True
+        cleanup_thread.start()
+        cleanup_thread.join()
+        self.root.quit()
+        self.root.destroy()
+
+    def cleanup_files(self):
+        try:
+            if os.path.exists("schedule.txt"):
+                os.remove("schedule.txt")
+            if os.path.exists("days"):
+                if os.path.isdir("days"):
+                    shutil.rmtree("days")
+                else:
+                    os.remove("days")
+        except Exception as e:
+            print(f"Error during cleanup: {e}")
+
+    def create_widgets(self):
+        self.class_info_label = tk.Label(self.root, text="Available Class Information:")
+        self.class_info_label.pack(pady=5)
+
+        self.class_info_listbox = tk.Listbox(self.root, width=70, height=10)
+        self.class_info_listbox.pack(pady=5)
+        self.class_info_listbox.bind("<<ListboxSelect>>", self.prefill_suggestion)
+
+        self.rename_label = tk.Label(self.root, text="Edit Selected Class:")
+        self.rename_label.pack(pady=5)
+
+        self.rename_entry = tk.Entry(self.root, width=50)
+        self.rename_entry.pack(pady=5)
+        self.rename_entry.bind("<KeyRelease>", self.show_completions)
+
+        self.rename_button = tk.Button(self.root, text="Update Selected Classes", command=self.rename_class)
+        self.rename_button.pack(pady=5)
+
+        self.update_all_button = tk.Button(self.root, text="Update All Classes", command=self.update_all_themes)
+        self.update_all_button.pack(pady=5)
+
+        self.suggest_button = tk.Button(self.root, text="Apply Suggested Themes", command=self.apply_suggestions)
+        self.suggest_button.pack(pady=5)
+
+        button_frame = tk.Frame(self.root)
+        button_frame.pack(pady=5)
+
+        self.save_button = tk.Button(button_frame, text="Save PDF Document", command=self.save_updated_document)
+        self.save_button.pack(side=tk.LEFT, padx=5)
+
+        self.signature_checkbox = tk.Checkbutton(button_frame, text="Digital(No Signature)", command=self.toggle_signature)
+        self.signature_checkbox.pack(side=tk.LEFT)
+
+        self.status_label = tk.Label(self.root, text="", fg="green")
+        self.status_label.pack(pady=5)
+
+        self.cancel_button = tk.Button(self.root, text="Cancel", command=self.cancel_task)
+
+        self.include_signature = True
+
+        self.editor_buttons = [self.rename_button, self.update_all_button, self.suggest_button, self.save_button]
+
+    def set_editor_buttons(self, state):
+        for button in self.editor_buttons:
+            button.config(state=state)
+
+    def run_task(self, func, on_done=None, description="Working"):
+        # One background task at a time; its progress replaces the status
+        # text and a Cancel button is shown while it runs. The editor buttons
+        # are disabled until it ends.
+        if self.task and not self.task.finished:
+            messagebox.showwarning("Warning", "Please wait until the current task has finished.")
+            return None
+
+        def progress(message):
+            self.status_label.config(text=f"{description}: {message}", fg="blue")
+
+        def finish(callback, value):
+            self.cancel_button.pack_forget()
+            self.set_editor_buttons(tk.NORMAL)
+            if callback:
+                callback(value)
+
+        def failed(error):
+            self.status_label.config(text=f"{description} failed: {error}", fg="red")
+
+        def cancelled(_):
+            self.status_label.config(text=f"{description} cancelled.", fg="red")
+
+        self.status_label.config(text=f"{description}...", fg="blue")
+        self.cancel_button.pack(pady=5)
+        self.set_editor_buttons(tk.DISABLED)
+        self.task = BackgroundTask(self.root, func, on_progress=progress,
+                                   on_done=lambda value: finish(on_done, value),
+                                   on_error=lambda error: finish(failed, error),
+                                   on_cancelled=lambda value: finish(cancelled, value)).start()
+        return self.task
+
+    def cancel_task(self):
+        if self.task and not self.task.finished:
+            self.task.cancel()
+            self.status_label.config(text="Cancelling...", fg="red")
+
+    def load_class_info(self):
+        if not os.path.exists(SCHEDULE_DOC):
+            messagebox.showerror("Error", "Document not found. Please generate or provide the document.")
+            return
+        self.week = current_week()
+        # The list is filled from a streaming read of the tables; the full
+        # python-docx document is only needed for edits, so it loads meanwhile.
+        class_info, message = extract_class_info_from_docx(SCHEDULE_DOC)
+        self.document_loader = threading.Thread(target=self.load_document, daemon=True)
+        self.document_loader.start()
+        if class_info:
+            self.class_info = class_info
+            self.original_class_info = list(class_info)
+            self.theme_index = ThemeIndex(class_info)
+            self.class_info_listbox.delete(0, tk.END)
+            for day, theme, instructor in class_info:
+                self.class_info_listbox.insert(tk.END, f"{day}: {theme}")
+        else:
+            messagebox.showerror("Error", message)
+
+    def load_document(self):
+        try:
+            document = profiler.call('gui load document', Document, SCHEDULE_DOC)
+            self.cell_index = index_theme_cells(document)
+            self.document = document
+            self.writer = BackgroundDocumentWriter(document, SCHEDULE_DOC, self.cell_index, self.theme_updates,
+                                                   week=self.week)
+            # Mappings queued while the document was loading.
+            if not self.theme_updates.empty():
+                self.writer.changed.set()
+        except Exception as e:
+            print(f"Error loading document: {e}")
+            self.save_queued_themes()
+
+    def wait_for_document(self):
+        if self.document_loader:
+            self.document_loader.join()
+        return self.writer is not None
+
+    def rename_class(self):
+        selected = self.class_info_listbox.curselection()
+        if not selected:
+            messagebox.showwarning("Warning", "Please select a class to rename.")
+            return
+        
+        selected_index = selected[0]
+        day, old_theme, instructor = self.class_info[selected_index]
+
+        if ' / ' in old_theme:
+            theme_prefix = old_theme.split(' / ')[0]
+            theme_suffix = old_theme.split(' / ')[1]
+        else:
+            theme_prefix = old_theme
+            theme_suffix = ""
+
+        new_theme_prefix = self.rename_entry.get().strip()
+
+        if new_theme_prefix and new_theme_prefix != theme_prefix:
+            new_theme = f"{new_theme_prefix} / {theme_suffix}" if theme_suffix else new_theme_prefix
+
+            self.updated_themes[old_theme] = new_theme
+
+            for i in self.theme_index.rows_with_prefix(theme_prefix):
+                current_day, current_theme, current_instructor = self.class_info[i]
+                if ' / ' in current_theme:
+                    new_theme_for_instructor = f"{new_theme_prefix} / {current_theme.split(' / ')[1]}"
+                    self.updated_themes[current_theme] = new_theme_for_instructor
+                else:
+                    self.updated_themes[current_theme] = new_theme_prefix
+                # Update the class_info list
+                self.class_info[i] = (current_day, self.updated_themes[current_theme], current_instructor)
+                self.theme_index.move(i, current_theme, self.updated_themes[current_theme])
+
+            self.theme_index.move(selected_index, self.class_info[selected_index][1], new_theme)
+            self.class_info[selected_index] = (day, new_theme, instructor)
+
+            self.refresh_class_info_list()
+            self.status_label.config(text=f"Theme '{old_theme}' renamed to '{new_theme}'.", fg="green")
+
+            self.apply_updated_themes()
+
+        
+    def prefill_suggestion(self, event=None):
+        selected = self.class_info_listbox.curselection()
+        if not selected:
+            return
+        day, theme, instructor = self.class_info[selected[0]]
+        subject = self.suggestions.suggest_subject(theme, day) or split_theme(theme)[0]
+        self.rename_entry.delete(0, tk.END)
+        self.rename_entry.insert(0, subject)
+
+    def show_completions(self, event=None):
+        completions = self.suggestions.complete(self.rename_entry.get())
+        if completions:
+            self.status_label.config(text="Suggestions: " + ", ".join(completions), fg="green")
+
+    def apply_suggestions(self):
+        changed = 0
+        for i, (day, theme, instructor) in enumerate(self.class_info):
+            new_theme = self.suggestions.suggest(theme, day)
+            if new_theme and new_theme != theme:
+                self.updated_themes[theme] = new_theme
+                self.class_info[i] = (day, new_theme, instructor)
+                self.theme_index.move(i, theme, new_theme)
+                changed += 1
+        if not changed:
+            self.status_label.config(text="No suggestions for this week.", fg="green")
+            return
+        self.refresh_class_info_list()
+        self.status_label.config(text=f"Applied {changed} suggested themes.", fg="green")
+        self.apply_updated_themes()
+
+    def record_renames(self):
+        renames = [(day, old_theme, new_theme)
+                   for (day, old_theme, _), (_, new_theme, _) in zip(self.original_class_info, self.class_info)
+                   if new_theme != old_theme and new_theme != "Praxisunterricht"]
+        if renames:
+            get_theme_store().record_usage(renames)
+            for day, old_theme, new_theme in renames:
+                self.suggestions.add(old_theme, new_theme, day)
+            self.original_class_info = list(self.class_info)
+
+    def refresh_class_info_list(self):
+        self.class_info_listbox.delete(0, tk.END)
+        for day, theme, instructor in self.class_info:
+            self.class_info_listbox.insert(tk.END, f"{day}: {theme}")
+
+    def update_all_themes(self):
+        all_updated_themes = []
+        for day, theme, instructor in self.class_info:
+            updated_theme = self.updated_themes.get(theme, theme)
+            all_updated_themes.append((day, updated_theme, instructor))
+        
+        self.class_info_listbox.delete(0, tk.END)
+        for day, updated_theme, instructor in all_updated_themes:
+            self.class_info_listbox.insert(tk.END, f"{day}: {updated_theme}")
+        
+        self.status_label.config(text="All themes have been updated.", fg="green")
+
+        self.apply_updated_themes()
+
+    def apply_updated_themes(self, themes=None):
+        # Runs on the Tk thread, so it only queues the mapping: the writer
+        # applies it, also when the document is still loading. Without a
+        # document only the mapping is saved.
+        themes = self.updated_themes if themes is None else themes
+        loading = self.document_loader is not None and self.document_loader.is_alive()
+        self.theme_updates.put(dict(themes))
+        if self.writer:
+            self.writer.changed.set()
+        elif not loading:
+            self.save_queued_themes()
+
+    def save_queued_themes(self):
+        queued = drain_queue(self.theme_updates)
+        if queued:
+            save_themes(queued[-1], self.week)
+    
+    def toggle_signature(self):
+        self.include_signature = not self.include_signature
+        status = "included" if self.include_signature else "removed"
+        self.status_label.config(text=f"Signature section will be {status}.", fg="green")
+
+    def save_updated_document(self):
+        valid_themes = {theme: new_theme for theme, new_theme in self.updated_themes.items() if new_theme != "Praxisunterricht"}
+        if not valid_themes:
+            messagebox.showwarning("Warning", "No valid themes to save.")
+            return
+        self.apply_updated_themes(valid_themes)
+        self.record_renames()
+        self.save_as_pdf(SCHEDULE_DOC, self.include_signature)
+
+
+    def save_as_pdf(self, doc_path, include_signature):
+        def export(report, cancel_event):
+            report("saving document")
+            if self.wait_for_document():
+                self.writer.flush()
+            schedule_text = read_schedule_from_file('schedule.txt')
+            pdf_path = pdf_output_path(doc_path, schedule_text)
+            report("reading tables")
+            if self.writer:
+                with self.writer.lock:
+                    header, day_rows = report_from_document(self.document)
+            else:
+                header, day_rows = report_from_docx(doc_path)
+            if cancel_event.is_set():
+                raise TaskCancelled()
+            report("archiving")
+            archive_week(header, day_rows)
+            report("rendering")
+            return profiler.call('pdf render', render_report_pdf, pdf_path, header, day_rows, include_signature)
+
+        def saved(pdf_path):
+            self.status_label.config(text=f"Document saved as PDF: {pdf_path}", fg="green")
+
+        self.run_task(export, saved, "Saving PDF")
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = ThemeEditorApp(root)
+    root.mainloop()
@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+THEME_DB = "updated_themes.db"
+LEGACY_THEME_FILE = "updated_themes.json"
+
+# Theme renames live in SQLite instead of a JSON file that is rewritten on
+# every click. Only the mappings that changed are written, each save is one
+# transaction, and every change is also recorded per week so older
+# mappings can be looked up again. Weeks are recorded as "2024-KW12"
+# ("12" before the year was added).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS themes (
+    theme TEXT PRIMARY KEY,
+    new_theme TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS theme_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    week TEXT,
+    theme TEXT NOT NULL,
+    new_theme TEXT,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS theme_history_week ON theme_history (week);
+CREATE TABLE IF NOT EXISTS theme_usage (
+    weekday TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    new_theme TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (weekday, theme, new_theme)
+);
+"""
+
+
+def week_sort_key(week):
+    # By year, then by week number; the week column is TEXT, so "10" would
+    # sort before "9".
+    year, _, kw = week.rpartition("-KW")
+    return int(year) if year.isdigit() else 0, [int(number) for number in re.findall(r"\d+", kw)], week
+
+
+class ThemeStore:
+    def __init__(self, db_path=THEME_DB, legacy_file=LEGACY_THEME_FILE):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        # The GUI saves from its background writer thread as well.
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.themes = dict(self.connection.execute("SELECT theme, new_theme FROM themes"))
+        if not self.themes and legacy_file and os.path.exists(legacy_file):
+            # Renamed once imported, so clearing every mapping later does
+            # not bring the old file back.
+            if self.import_json(legacy_file):
+                try:
+                    os.replace(legacy_file, legacy_file + ".imported")
+                except OSError as e:
+                    print(f"Could not rename {legacy_file}: {e}")
+
+    def import_json(self, json_file):
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                themes = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not import {json_file}: {e}")
+            return False
+        self.sync(themes)
+        return True
+
+    def load(self):
+        with self.lock:
+            return dict(self.themes)
+
+    def get(self, theme, default=None):
+        return self.themes.get(theme, default)
+
+    def set(self, theme, new_theme, week=None):
+        self.update({theme: new_theme}, week)
+
+    def update(self, themes, week=None):
+        # Upserts the given mappings and leaves all others alone.
+        with self.lock:
+            changes = [(theme, new_theme) for theme, new_theme in themes.items()
+                       if self.themes.get(theme) != new_theme]
+            self.commit(changes, [], week)
+
+    def sync(self, themes, week=None):
+        # Makes the store equal to themes, writing only the difference.
+        with self.lock:
+            changes = [(theme, new_theme) for theme, new_theme in themes.items()
+                       if self.themes.get(theme) != new_theme]
+            removed = [theme for theme in self.themes if theme not in themes]
+            self.commit(changes, removed, week)
+
+    def commit(self, changes, removed, week):
+        if not changes and not removed:
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO themes (theme, new_theme, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(theme) DO UPDATE SET new_theme = excluded.new_theme, updated_at = excluded.updated_at",
+                [(theme, new_theme, now) for theme, new_theme in changes],
+            )
+            self.connection.executemany("DELETE FROM themes WHERE theme = ?", [(theme,) for theme in removed])
+            self.connection.executemany(
+                "INSERT INTO theme_history (week, theme, new_theme, changed_at) VALUES (?, ?, ?, ?)",
+                [(week, theme, new_theme, now) for theme, new_theme in changes]
+                + [(week, theme, None, now) for theme in removed],
+            )
+        for theme, new_theme in changes:
+            self.themes[theme] = new_theme
+        for theme in removed:
+            del self.themes[theme]
+
+    def weeks(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT DISTINCT week FROM theme_history WHERE week IS NOT NULL")
+            return sorted((week for (week,) in rows), key=week_sort_key)
+
+    def themes_for_week(self, week):
+        # The mappings as they were left after the last edit of that week.
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT theme, new_theme FROM theme_history "
+                "WHERE id <= (SELECT MAX(id) FROM theme_history WHERE week = ?) ORDER BY id", (week,))
+            themes = {}
+            for theme, new_theme in rows:
+                if new_theme is None:
+                    themes.pop(theme, None)
+                else:
+                    themes[theme] = new_theme
+            return themes
+
+    def history(self, theme):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT week, new_theme, changed_at FROM theme_history WHERE theme = ? ORDER BY id", (theme,)
+            ).fetchall()
+
+    def record_usage(self, renames):
+        # renames: (weekday, theme, new_theme) for every renamed row of a
+        # saved week; feeds the suggestions for the following weeks.
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO theme_usage (weekday, theme, new_theme, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(weekday, theme, new_theme) DO UPDATE SET count = count + 1",
+                list(renames),
+            )
+
+    def usage(self):
+        with self.lock:
+            return self.connection.execute("SELECT weekday, theme, new_theme, count FROM theme_usage").fetchall()
+
+    def export_json(self, json_file):
+        with self.lock:
+            themes = dict(self.themes)
+        tmp_path = json_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(themes, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, json_file)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
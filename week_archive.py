@@ -0,0 +1,439 @@
+import os
+import re
+import json
+import mmap
+import heapq
+import struct
+import argparse
+import tempfile
+from model import WEEKDAYS, ClassEntry, DaySchedule
+from pdf_report import report_from_docx, render_report_pdf
+
+# Processed weeks in one binary file, so an old week can be reopened
+# without going back to its DOCX or PDF. Layout, all little endian:
+#
+#   header   magic, version, counts and the offsets of the sections below
+#   strings  end offset per string, then the UTF-8 bytes; sorted, so a
+#            string is found by binary search and each is stored once
+#   weeks    WEEK records: header string ids, first entry, entry count
+#   entries  ENTRY records: subject id, instructor id, minutes, weekday
+#   index    INDEX records sorted by (class id, year, kw) -> week number
+#
+# Records are fixed width and read straight from the memory-mapped file.
+# A week is stored as it appears in the report (pdf_report's header and
+# day rows), themes included.
+#
+# New weeks are appended to a log next to the archive (one JSON line per
+# week), so saving a week does not rewrite the file. Readers lay the log
+# over the archive, a logged week replacing an archived one with the same
+# class, year and KW; once the log holds COMPACT_WEEKS weeks it is merged
+# into a new archive.
+
+DEFAULT_ARCHIVE = os.path.join(os.path.expanduser("~"), ".classeditor", "weeks.archive")
+MAGIC = b"CEWA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIIII")
+STRING_END = struct.Struct("<I")
+WEEK = struct.Struct("<IIIIIIII")
+ENTRY = struct.Struct("<IIHBx")
+INDEX = struct.Struct("<IHHI")
+HEADER_FIELDS = ("class_name", "name", "year", "from", "to", "kw")
+LOG_SUFFIX = ".log"
+COMPACT_WEEKS = 64
+
+
+def week_key(header):
+    # (year, kw) of a report header; 0 where it is unknown.
+    date = re.search(r'\d{2}\.\d{2}\.(\d{4})', header["from"])
+    year = date.group(1) if date else header["year"]
+    kw = re.match(r'\d{1,2}', header["kw"])
+    return int(year) if year.isdigit() else 0, int(kw.group(0)) if kw else 0
+
+
+def split_row_text(text):
+    subject, _, instructor = text.partition(" / ")
+    return subject, instructor
+
+
+def row_text(subject, instructor):
+    return f"{subject} / {instructor}" if instructor else subject
+
+
+def duration_minutes(duration):
+    try:
+        return round(float(duration.replace(",", ".")) * 60)
+    except ValueError:
+        raise ValueError(f"Invalid duration: {duration!r}")
+
+
+def duration_text(minutes):
+    return str(minutes // 60) if minutes % 60 == 0 else f"{minutes / 60:g}"
+
+
+def week_entries(day_rows):
+    # (weekday, subject, instructor, minutes) of pdf_report day rows.
+    entries = []
+    for day, rows in day_rows:
+        if day not in WEEKDAYS:
+            raise ValueError(f"Unknown day: {day!r}")
+        for text, duration in rows:
+            entries.append((day,) + split_row_text(text) + (duration_minutes(duration),))
+    return entries
+
+
+def write_archive(path, weeks):
+    # weeks: list of (header, day_rows). Written to a temporary file first
+    # so readers never see half an archive.
+    strings = {header[field] for header, _ in weeks for field in HEADER_FIELDS}
+    for _, day_rows in weeks:
+        for _, rows in day_rows:
+            for text, _ in rows:
+                strings.update(split_row_text(text))
+    strings = sorted(strings)
+    ids = {text: i for i, text in enumerate(strings)}
+
+    ends = bytearray()
+    blob = bytearray()
+    for text in strings:
+        blob += text.encode("utf-8")
+        ends += STRING_END.pack(len(blob))
+
+    week_data = bytearray()
+    entry_data = bytearray()
+    keys = []
+    entry_count = 0
+    for number, (header, day_rows) in enumerate(weeks):
+        first_entry = entry_count
+        for day, subject, instructor, minutes in week_entries(day_rows):
+            entry_data += ENTRY.pack(ids[subject], ids[instructor], minutes, WEEKDAYS.index(day))
+            entry_count += 1
+        week_data += WEEK.pack(*[ids[header[field]] for field in HEADER_FIELDS], first_entry,
+                               entry_count - first_entry)
+        keys.append((ids[header["class_name"]],) + week_key(header) + (number,))
+    index_data = b"".join(INDEX.pack(*key) for key in sorted(keys))
+
+    strings_offset = HEADER.size
+    weeks_offset = strings_offset + len(ends) + len(blob)
+    entries_offset = weeks_offset + len(week_data)
+    index_offset = entries_offset + len(entry_data)
+    header_data = HEADER.pack(MAGIC, VERSION, 0, len(strings), len(weeks), entry_count, strings_offset,
+                              weeks_offset, entries_offset, index_offset)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for data in (header_data, ends, blob, week_data, entry_data, index_data):
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class WeekArchive:
+    # Week numbers below week_count are archived weeks, the ones above are
+    # logged weeks in log order.
+    def __init__(self, path=DEFAULT_ARCHIVE):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.file = None
+        self.data = None
+        self.open()
+
+    def open(self):
+        self.close()
+        self.string_count = self.week_count = self.entry_count = 0
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size:
+            self.open_archive()
+        self.read_log()
+
+    def open_archive(self):
+        self.file = open(self.path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.string_count, self.week_count, self.entry_count, self.strings_offset,
+         self.weeks_offset, self.entries_offset, self.index_offset) = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} week archive")
+        self.blob_offset = self.strings_offset + self.string_count * STRING_END.size
+
+    def read_log(self):
+        # A line that does not parse (a save cut short) is skipped.
+        self.log_weeks = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        week = json.loads(line)
+                        self.log_weeks.append((week["header"], [tuple(entry) for entry in week["entries"]]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        self.log_keys = {}
+        for i, (header, _) in enumerate(self.log_weeks):
+            self.log_keys[(header["class_name"],) + week_key(header)] = self.week_count + i
+        self.replaced = set()
+        if self.week_count:
+            for class_name, year, kw in self.log_keys:
+                number = self.find_archived(class_name, kw, year)
+                if number is not None:
+                    self.replaced.add(number)
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def string_bytes(self, string_id):
+        end = STRING_END.unpack_from(self.data, self.strings_offset + string_id * STRING_END.size)[0]
+        start = STRING_END.unpack_from(self.data, self.strings_offset + (string_id - 1) * STRING_END.size)[0] \
+            if string_id else 0
+        return self.data[self.blob_offset + start:self.blob_offset + end]
+
+    def string(self, string_id):
+        return self.string_bytes(string_id).decode("utf-8")
+
+    def string_id(self, text):
+        target = text.encode("utf-8")
+        low, high = 0, self.string_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.string_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.string_count and self.string_bytes(low) == target:
+            return low
+        return None
+
+    def index_record(self, position):
+        return INDEX.unpack_from(self.data, self.index_offset + position * INDEX.size)
+
+    def lower_bound(self, key):
+        low, high = 0, self.week_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.index_record(middle)[:3] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, class_name, kw, year=None):
+        # Week number of class_name in KW kw; the latest year when year is
+        # not given. None if neither the archive nor the log has it.
+        if year is not None:
+            number = self.log_keys.get((class_name, year, kw))
+            return number if number is not None else self.find_archived(class_name, kw, year)
+        years = [key[1] for key in self.log_keys if key[0] == class_name and key[2] == kw]
+        number = self.find_archived(class_name, kw)
+        if years and (number is None or max(years) >= week_key(self.week_header(number))[0]):
+            return self.log_keys[(class_name, max(years), kw)]
+        return number
+
+    def find_archived(self, class_name, kw, year=None):
+        if not self.week_count:
+            return None
+        class_id = self.string_id(class_name)
+        if class_id is None:
+            return None
+        if year is not None:
+            position = self.lower_bound((class_id, year, kw))
+            if position < self.week_count and self.index_record(position)[:3] == (class_id, year, kw):
+                return self.index_record(position)[3]
+            return None
+        position = self.lower_bound((class_id + 1, 0, 0))
+        while position > 0:
+            position -= 1
+            record_class, _, record_kw, number = self.index_record(position)
+            if record_class != class_id:
+                break
+            if record_kw == kw:
+                return number
+        return None
+
+    def scan(self, class_name=None, start=(0, 0), end=(0xFFFF, 0xFFFF)):
+        # Week numbers ordered by class, year and KW, limited to one class
+        # and to weeks between start and end, both (year, kw) and inclusive.
+        if not self.log_keys:
+            yield from self.scan_archived(class_name, start, end)
+            return
+        logged = sorted((key, number) for key, number in self.log_keys.items()
+                        if (class_name is None or key[0] == class_name) and start <= key[1:] <= end)
+        archived = ((self.archived_key(number), number) for number in self.scan_archived(class_name, start, end)
+                    if number not in self.replaced)
+        for _, number in heapq.merge(archived, logged):
+            yield number
+
+    def archived_key(self, number):
+        header = self.week_header(number)
+        return (header["class_name"],) + week_key(header)
+
+    def scan_archived(self, class_name=None, start=(0, 0), end=(0xFFFF, 0xFFFF)):
+        if not self.week_count:
+            return
+        if class_name is None:
+            for position in range(self.week_count):
+                class_id, year, kw, number = self.index_record(position)
+                if start <= (year, kw) <= end:
+                    yield number
+            return
+        class_id = self.string_id(class_name)
+        if class_id is None:
+            return
+        position = self.lower_bound((class_id,) + tuple(start))
+        while position < self.week_count:
+            record_class, year, kw, number = self.index_record(position)
+            if record_class != class_id or (year, kw) > end:
+                break
+            yield number
+            position += 1
+
+    def week_header(self, number):
+        if number >= self.week_count:
+            return dict(self.log_weeks[number - self.week_count][0])
+        ids = WEEK.unpack_from(self.data, self.weeks_offset + number * WEEK.size)
+        return {field: self.string(string_id) for field, string_id in zip(HEADER_FIELDS, ids)}
+
+    def iter_entries(self, number):
+        # (weekday, subject, instructor, minutes) of one week.
+        if number >= self.week_count:
+            yield from self.log_weeks[number - self.week_count][1]
+            return
+        first_entry, entry_count = WEEK.unpack_from(self.data, self.weeks_offset + number * WEEK.size)[6:]
+        for i in range(first_entry, first_entry + entry_count):
+            subject_id, instructor_id, minutes, weekday = ENTRY.unpack_from(self.data,
+                                                                            self.entries_offset + i * ENTRY.size)
+            yield WEEKDAYS[weekday], self.string(subject_id), self.string(instructor_id), minutes
+
+    def week(self, number):
+        # (header, day_rows) as pdf_report builds them, ready to render.
+        day_rows = []
+        for day, subject, instructor, minutes in self.iter_entries(number):
+            if not day_rows or day_rows[-1][0] != day:
+                day_rows.append((day, []))
+            day_rows[-1][1].append((row_text(subject, instructor), duration_text(minutes)))
+        return self.week_header(number), day_rows
+
+    def days(self, number):
+        days = []
+        for day, subject, instructor, minutes in self.iter_entries(number):
+            if not days or days[-1].day != day:
+                days.append(DaySchedule(day))
+            days[-1].entries.append(ClassEntry(subject, instructor, minutes))
+        return days
+
+    def add(self, header, day_rows):
+        self.add_weeks([(header, day_rows)])
+
+    def add_weeks(self, new_weeks):
+        # Appends the weeks to the log; a week already stored for the same
+        # class, year and KW is replaced.
+        lines = []
+        for header, day_rows in new_weeks:
+            header = {field: header[field] for field in HEADER_FIELDS}
+            lines.append(json.dumps({"header": header, "entries": week_entries(day_rows)}, ensure_ascii=False))
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+        self.read_log()
+        if len(self.log_weeks) >= COMPACT_WEEKS:
+            self.compact()
+
+    def compact(self):
+        # Writes archive and log into a new archive and removes the log. If
+        # this stops half way, the log only repeats weeks the archive has.
+        weeks = [self.week(number) for number in self.scan()]
+        self.close()
+        try:
+            write_archive(self.path, weeks)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+        finally:
+            self.open()
+
+    def __len__(self):
+        return self.week_count - len(self.replaced) + len(self.log_keys)
+
+
+def archive_week(header, day_rows, path=DEFAULT_ARCHIVE):
+    try:
+        archive = WeekArchive(path)
+        try:
+            archive.add(header, day_rows)
+        finally:
+            archive.close()
+    except (OSError, ValueError) as e:
+        print(f"Could not archive the week: {e}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Store processed weeks and reopen them without the DOCX or PDF.")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="archive generated DOCX reports")
+    add.add_argument("docx_files", nargs="+")
+
+    commands.add_parser("compact", help="merge the log of recently added weeks into the archive")
+
+    list_weeks = commands.add_parser("list", help="list archived weeks")
+    list_weeks.add_argument("--class", dest="class_name", default=None)
+
+    for name, help_text in (("show", "print an archived week"), ("render", "render an archived week as PDF")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("kw", type=int)
+        command.add_argument("--class", dest="class_name", required=True)
+        command.add_argument("--year", type=int, default=None)
+    commands.choices["render"].add_argument("-o", "--output", default=None)
+    commands.choices["render"].add_argument("--no-signature", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    archive = WeekArchive(args.archive)
+    try:
+        if args.command == "add":
+            weeks = []
+            for docx_file in args.docx_files:
+                try:
+                    weeks.append(report_from_docx(docx_file))
+                except Exception as e:
+                    print(f"Skipping {docx_file}: {e}")
+            archive.add_weeks(weeks)
+            print(f"{len(archive)} weeks in {args.archive}")
+        elif args.command == "compact":
+            archive.compact()
+            print(f"{len(archive)} weeks in {args.archive}")
+        elif args.command == "list":
+            for number in archive.scan(args.class_name):
+                header = archive.week_header(number)
+                year, kw = week_key(header)
+                print(f"{header['class_name']:<12} {year}-KW{kw:<3} {header['from']} - {header['to']}")
+        else:
+            number = archive.find(args.class_name, args.kw, args.year)
+            if number is None:
+                print(f"KW {args.kw} of {args.class_name} is not archived.")
+            elif args.command == "show":
+                header, day_rows = archive.week(number)
+                print(f"{header['class_name']} KW {header['kw']}: {header['from']} - {header['to']}")
+                for day, rows in day_rows:
+                    print(day)
+                    for text, duration in rows:
+                        print(f"  {text:<50} {duration}")
+            else:
+                header, day_rows = archive.week(number)
+                output_file = args.output or f"Weekly_Class_Schedules_{header['kw'] or 'KW_Unknown'}.pdf"
+                render_report_pdf(output_file, header, day_rows, not args.no_signature)
+                print(f"Saved {output_file}")
+    finally:
+        archive.close()